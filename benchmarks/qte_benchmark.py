@@ -0,0 +1,285 @@
+"""qte_benchmark.py -- time QTE operations on synthetic scenes
+
+Run in background mode (no GPU or display needed):
+
+    blender -b --factory-startup --python benchmarks/qte_benchmark.py -- \
+        --output results.json [--compare previous.json]
+
+This first times importing and registering QTE, which is checked against
+--register-budget-ms (the exit status is 1 if it is over). It then
+generates scenes with 10/100/1,000/10,000 text strips of 5-500 word
+sentences, times splitting to appearing words, preset application and
+drawing the preferences, then writes the results as JSON. With --compare,
+the timings are also printed next to those from an earlier run.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from os import path
+from types import SimpleNamespace
+
+import addon_utils
+import bpy
+
+ADDON_MODULE = "quicker-text-editing"
+REPO_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+
+WORDS = ("The quick brown fox jumps over the lazy dog while narrativism "
+         "of farce keeps every subtitle editor busy").split(" ")
+
+
+class NullLayout:
+    """Stands in for a UILayout, so draw() can be timed without a window"""
+
+    def __getattr__(self, name):
+        return self._call
+
+    def _call(self, *args, **kwargs):
+        return self
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="qte_benchmark.py",
+                                     description="Benchmark QTE in Blender background mode")
+    parser.add_argument("--output", default="qte_benchmark.json",
+                        help="where to write results (JSON)")
+    parser.add_argument("--compare", help="earlier results (JSON) to compare against")
+    parser.add_argument("--strips", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="numbers of text strips per scene")
+    parser.add_argument("--words", type=int, nargs="+", default=[5, 50, 500],
+                        help="numbers of words per sentence")
+    parser.add_argument("--max-split-words", type=int, default=100000,
+                        help="skip splits which would create more word strips than this")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="how many times to run each benchmark")
+    parser.add_argument("--register-budget-ms", type=float, default=20.0,
+                        help="most that importing and registering QTE may take (median)")
+    return parser.parse_args(argv)
+
+
+def enable_addon():
+    """Enable QTE from this checkout and return its module"""
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    module = addon_utils.enable(ADDON_MODULE, default_set=True)
+    if module is None:
+        raise RuntimeError(f"Could not enable {ADDON_MODULE} from {REPO_DIR}")
+    return module
+
+
+def bench_register(repeat, budget_ms):
+    """Time importing + registering QTE from scratch, as at Blender startup"""
+    numpy_before = "numpy" in sys.modules
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+
+    def run(timings):
+        addon_utils.disable(ADDON_MODULE, default_set=True)
+        sys.modules.pop(ADDON_MODULE, None)
+        start = time.perf_counter()
+        module = addon_utils.enable(ADDON_MODULE, default_set=True)
+        timings.append(time.perf_counter() - start)
+        if module is None:
+            raise RuntimeError(f"Could not enable {ADDON_MODULE} from {REPO_DIR}")
+        return module
+
+    seconds, _ = timed(run, repeat)
+    return {
+        "seconds": seconds,
+        "budget_ms": budget_ms,
+        "within_budget": seconds["median"] * 1000 <= budget_ms,
+        # NumPy is only imported once it's needed, so shouldn't be by registering
+        "imported_numpy": "numpy" in sys.modules and not numpy_before,
+    }
+
+
+def make_scene(strip_count, word_count, duration=100):
+    """Create a scene with strip_count text strips of word_count words, one after another"""
+    scene = bpy.data.scenes.new("qte_benchmark")
+    scene.render.resolution_x = 1920
+    scene.render.resolution_y = 1080
+    sequences = scene.sequence_editor_create().sequences
+    for i in range(strip_count):
+        strip = sequences.new_effect(name=f"text_{i}", type='TEXT', channel=1,
+                                     frame_start=1 + i * duration,
+                                     frame_end=1 + (i + 1) * duration)
+        strip.text = " ".join(WORDS[(i + j) % len(WORDS)] for j in range(word_count))
+        strip.location = (0.05, 0.1)
+        strip.font_size = 40
+    return scene
+
+
+def timed(function, repeat):
+    """Run function (given a fresh setup each time) repeat times; returns timings + last result"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        result = function(timings)
+    return {"min": min(timings), "median": statistics.median(timings)}, result
+
+
+def bench_split(qte, strip_count, word_count, repeat, output_mode="Words"):
+    prop_group = bpy.context.window_manager.appearing_text_options
+    prop_group.temporal_offset_type = "Fixed"
+    prop_group.frame_offset = 5
+    prop_group.output_mode = output_mode
+
+    def run(timings):
+        scene = make_scene(strip_count, word_count)
+        strips = list(scene.sequence_editor.sequences)
+        qte.clear_font_metrics()
+        start = time.perf_counter()
+        allocator = qte.ChannelAllocator.from_sequences(scene.sequence_editor.sequences)
+        created = 0
+        try:
+            for strip in strips:
+                created += len(qte.split_text_strip(strip, prop_group,
+                                                    scene.render.resolution_x, allocator))
+        finally:
+            timings.append(time.perf_counter() - start)
+            bpy.data.scenes.remove(scene)
+        return created
+
+    seconds, created = timed(run, repeat)
+    return {"seconds": seconds, "created": created}
+
+
+def bench_presets(qte, strip_count, repeat):
+    presets = {
+        "colour": (qte.SetTextColour, SimpleNamespace(colour=(1.0, 0.5, 0.0, 1.0))),
+        "colour_transition": (qte.SetTextColour, SimpleNamespace(colour=(1.0, 0.5, 0.0, 1.0),
+                                                                 transition_frames=12)),
+        "location": (qte.SetTextLocation, SimpleNamespace(location=(0.5, 0.2))),
+        "size": (qte.SetTextSize, SimpleNamespace(size=60.0, relative=False, fit=False,
+                                                  fit_fraction=0.9)),
+        "size_fit": (qte.SetTextSize, SimpleNamespace(size=0.0, relative=False, fit=True,
+                                                      fit_fraction=0.9)),
+        "duration": (qte.SetTextDuration, SimpleNamespace(duration=10, relative=True)),
+    }
+    results = {}
+    for preset_name, (operator, preset) in presets.items():
+        def run(timings):
+            scene = make_scene(strip_count, 5)
+            start = time.perf_counter()
+            strips = qte.find_matching_text_strips(scene.sequence_editor.sequences_all)
+            operator.apply_all(strips, preset)
+            timings.append(time.perf_counter() - start)
+            bpy.data.scenes.remove(scene)
+            return len(strips)
+
+        seconds, applied = timed(run, repeat)
+        results[preset_name] = {"seconds": seconds, "applied": applied}
+    return results
+
+
+def bench_preferences_draw(qte, preset_count, repeat):
+    keyconfigs = bpy.context.window_manager.keyconfigs
+    # there's no user keyconfig in background mode, so draw from one made for the run
+    keyconfig = keyconfigs.new("qte_benchmark")
+    km = keyconfig.keymaps.new("SequencerCommon", space_type='SEQUENCE_EDITOR')
+    idnames = list(qte.PRESET_OPERATORS)
+    for i in range(preset_count):
+        km.keymap_items.new(idnames[i % len(idnames)], 'F5', 'PRESS')
+    context = SimpleNamespace(window_manager=SimpleNamespace(
+        keyconfigs=SimpleNamespace(user=keyconfig)))
+    fake_preferences = SimpleNamespace(layout=NullLayout(), use_font_metrics_store=True)
+
+    def run(timings):
+        start = time.perf_counter()
+        qte.QTEPreferences.draw(fake_preferences, context)
+        timings.append(time.perf_counter() - start)
+
+    try:
+        seconds, _ = timed(run, repeat)
+    finally:
+        keyconfigs.remove(keyconfig)
+    return {"seconds": seconds}
+
+
+def run_benchmarks(args):
+    results = []
+
+    def record(benchmark, result, **parameters):
+        entry = {"benchmark": benchmark, **parameters, **result}
+        results.append(entry)
+        print(json.dumps(entry), flush=True)
+
+    # before anything else has had a chance to import what QTE uses
+    record("register", bench_register(args.repeat, args.register_budget_ms),
+           background=bpy.app.background)
+    qte = enable_addon()
+
+    for strip_count in args.strips:
+        for word_count in args.words:
+            for output_mode in ("Words", "Cumulative"):
+                parameters = {"strips": strip_count, "words": word_count, "mode": output_mode}
+                if strip_count * word_count > args.max_split_words:
+                    record("split", {"skipped": "over --max-split-words"}, **parameters)
+                    continue
+                try:
+                    record("split", bench_split(qte, strip_count, word_count, args.repeat,
+                                                output_mode), **parameters)
+                except ValueError as err:
+                    # eg more words in a sentence than there are channels for
+                    record("split", {"error": str(err)}, **parameters)
+
+        for preset_name, result in bench_presets(qte, strip_count, args.repeat).items():
+            record("apply_preset", result, preset=preset_name, strips=strip_count)
+
+        record("preferences_draw", bench_preferences_draw(qte, strip_count, args.repeat),
+               presets=strip_count)
+
+    return {
+        "blender": bpy.app.version_string,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def result_key(entry):
+    """Identify a result by its benchmark and parameters"""
+    return tuple(sorted((key, value) for key, value in entry.items()
+                        if key not in ("seconds", "created", "applied", "skipped", "error",
+                                       "budget_ms", "within_budget", "imported_numpy")))
+
+
+def compare(current, previous):
+    """Print current median timings against previous ones"""
+    previous_seconds = {result_key(entry): entry["seconds"]["median"]
+                        for entry in previous["results"] if "seconds" in entry}
+    print(f"{'benchmark':60} {'before':>10} {'after':>10} {'ratio':>7}")
+    for entry in current["results"]:
+        before = previous_seconds.get(result_key(entry))
+        if before is None or "seconds" not in entry:
+            continue
+        after = entry["seconds"]["median"]
+        label = ", ".join(f"{key}={value}" for key, value in result_key(entry))
+        ratio = after / before if before else float("inf")
+        print(f"{label:60} {before:10.4f} {after:10.4f} {ratio:7.2f}")
+
+
+def main():
+    args = parse_args()
+    results = run_benchmarks(args)
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(results, output, indent=1)
+    print(f"Wrote {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous:
+            compare(results, json.load(previous))
+
+    register = next(entry for entry in results["results"] if entry["benchmark"] == "register")
+    if not register["within_budget"]:
+        print(f"Registering QTE took {register['seconds']['median'] * 1000:.1f}ms, "
+              f"over the {register['budget_ms']}ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,28 @@
 """quicker-text-editing.py -- text addon for Blender VSE"""
+import atexit
+import bisect
+import collections
+import csv
+import fnmatch
+import functools
+import hashlib
+import heapq
+import itertools
+import html
+import importlib
+import json
+import math
+import os
+import re
+import sys
+import time
+import types
+import zipfile
 from os import path
 import bpy
 import blf
+from bpy.app.handlers import persistent
+from bpy_extras.io_utils import ExportHelper, ImportHelper
 
 bl_info = {
     "name": "Quicker Text Editing for VSE",
@@ -15,6 +36,167 @@ bl_info = {
     "category": "Sequencer",
 }
 
+# Highest channel available in the VSE
+MAX_CHANNEL = 128
+
+
+class LazyModule:
+    """Stands in for a module until it is first used, then imports it
+
+    The module then replaces this in the module globals under the same
+    name, so only the first use pays for the lookup. This keeps importing
+    (eg) NumPy out of Blender's startup
+    """
+
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+
+np = LazyModule("numpy", "np")
+
+# BEGIN profiling
+
+
+class Profiler:
+    """Opt-in timings and counters for QTE's hot paths
+
+    Everything recording to the profiler checks `enabled` first, so when
+    profiling is off (the default) the cost is one attribute lookup.
+    Operator timings keep a rolling window of the most recent calls
+    """
+
+    def __init__(self, window=200):
+        self.enabled = False
+        self.window = window
+        self.counts = collections.Counter()
+        self.timings = {}
+
+    def count(self, name, amount=1):
+        """Add to the counter for name"""
+        self.counts[name] += amount
+
+    def record(self, name, seconds):
+        """Record a wall time for name (eg an operator's bl_idname)"""
+        timings = self.timings.get(name)
+        if timings is None:
+            timings = self.timings[name] = collections.deque(maxlen=self.window)
+        timings.append(seconds)
+        self.counts[f"{name} calls"] += 1
+
+    def percentiles(self, name, points=(50, 90, 99)):
+        """Nearest-rank percentiles (in seconds) of the recent timings for name"""
+        timings = sorted(self.timings.get(name, ()))
+        if not timings:
+            return {}
+        return {point: timings[min(len(timings) - 1, int(len(timings) * point / 100))]
+                for point in points}
+
+    def summary(self) -> dict:
+        """Everything recorded so far, in a JSON-friendly form"""
+        return {
+            "counts": dict(self.counts),
+            "timings": {name: {f"p{point}": seconds
+                               for point, seconds in self.percentiles(name).items()}
+                        for name in self.timings},
+        }
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        self.counts.clear()
+        self.timings.clear()
+
+
+profiler = Profiler()
+
+
+def profiled(execute):
+    """Decorator for an operator's execute(), recording its wall time when profiling"""
+    @functools.wraps(execute)
+    def wrapper(self, context):
+        if not profiler.enabled:
+            return execute(self, context)
+        start = time.perf_counter()
+        result = execute(self, context)
+        profiler.record(self.bl_idname, time.perf_counter() - start)
+        if 'FINISHED' in result and 'UNDO' in getattr(self, "bl_options", ()):
+            profiler.count("undo pushes")
+        return result
+    return wrapper
+
+
+class QTE_OT_reset_profile(bpy.types.Operator):
+    """Forget all QTE profiling data recorded so far"""
+    bl_idname = "qte.reset_profile"
+    bl_label = "Reset Profile"
+
+    def execute(self, context):
+        profiler.reset()
+        return {'FINISHED'}
+
+
+class QTE_OT_dump_profile(bpy.types.Operator, ExportHelper):
+    """Write QTE profiling data to a (JSON) log file"""
+    bl_idname = "qte.dump_profile"
+    bl_label = "Dump Profile"
+
+    filename_ext = ".json"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.json",
+        options={'HIDDEN'},
+    )
+
+    def execute(self, context):
+        try:
+            with open(self.filepath, "w", encoding="utf-8") as log_file:
+                json.dump(profiler.summary(), log_file, indent=1)
+        except OSError as err:
+            self.report({"ERROR"}, f"Could not write {self.filepath}: {err}")
+            return {"CANCELLED"}
+        return {'FINISHED'}
+
+
+class SEQUENCER_PT_qte_profiling(bpy.types.Panel):
+    """Panel showing QTE profiling data (when enabled in the addon preferences)"""
+    bl_label = "Profiling"
+    bl_space_type = "SEQUENCE_EDITOR"
+    bl_region_type = "UI"
+    bl_category = "QTE"
+
+    @classmethod
+    def poll(cls, context):
+        return profiler.enabled
+
+    def draw(self, context):
+        """Draw operator timings then counters"""
+        layout = self.layout
+        for name in sorted(profiler.timings):
+            box = layout.box()
+            box.label(text=f"{name} ({profiler.counts[f'{name} calls']} calls)")
+            box.label(text="  ".join(f"p{point} {seconds * 1000:.1f}ms"
+                                     for point, seconds in profiler.percentiles(name).items()))
+        col = layout.column(align=True)
+        for name, count in sorted(profiler.counts.items()):
+            if not name.endswith(" calls"):
+                col.label(text=f"{name}: {count}")
+        row = layout.row()
+        row.operator("qte.reset_profile", icon='TRASH')
+        row.operator("qte.dump_profile", icon='EXPORT')
+
+
+def update_profiling(self, context):
+    """Turn profiling on/off along with its preference"""
+    profiler.enabled = self.enable_profiling
+
+
+# END profiling
+
 # BEGIN text sequence manipulation (colour/location/etc)
 
 
@@ -32,8 +214,112 @@ class TextSequenceAction(bpy.types.Operator):
         return (context.scene and context.scene.sequence_editor
                 and context.selected_editable_sequences is not None)
 
+    @classmethod
+    def apply_all(cls, strips, preset):
+        """Apply preset (this operator or a keymap item's properties) to each of strips"""
+        for strip in strips:
+            cls.apply(strip, preset)
+
+
+def animate_strips(strips, attr, value, frames):
+    """Animate attr (eg "color") of each of strips from its current value to value
+
+    Each transition is frames long, starting at the current frame if the
+    strip is showing then, otherwise at the start of the strip. Strips are
+    animated by their scene's action, which gets two keyframes per F-curve
+    (ie per strip per component of attr). These go in with one
+    keyframe_points.add() and foreach_set() per F-curve rather than a
+    keyframe_insert() each, and ease in and out with Bézier interpolation.
+    Existing keyframes within a transition are replaced
+    """
+    value = tuple(value)
+    by_scene = {}
+    for strip in strips:
+        by_scene.setdefault(strip.id_data, []).append(strip)
+
+    for scene, scene_strips in by_scene.items():
+        if scene.animation_data is None:
+            scene.animation_data_create()
+        action = scene.animation_data.action
+        if action is None:
+            action = scene.animation_data.action = bpy.data.actions.new(f"{scene.name}Action")
+        fcurves = {(fcurve.data_path, fcurve.array_index): fcurve for fcurve in action.fcurves}
+
+        for strip in scene_strips:
+            start = scene.frame_current
+            if not strip.frame_final_start <= start < strip.frame_final_end:
+                start = strip.frame_final_start
+            end = start + frames
+            data_path = strip.path_from_id(attr)
+            for index, (old, new) in enumerate(zip(getattr(strip, attr), value)):
+                fcurve = fcurves.get((data_path, index))
+                if fcurve is None:
+                    fcurve = action.fcurves.new(data_path, index=index, action_group=strip.name)
+                    fcurves[(data_path, index)] = fcurve
+                points = fcurve.keyframe_points
+                existing = np.empty(2 * len(points), dtype=np.float32)
+                points.foreach_get("co", existing)
+                key_frames = existing[0::2]
+                replaced = np.flatnonzero((key_frames >= start) & (key_frames <= end))
+                # removing a keyframe shifts the ones after it down, so go backwards
+                for i in replaced[::-1]:
+                    points.remove(points[int(i)], fast=True)
+                if len(replaced):
+                    existing = np.delete(existing.reshape(-1, 2), replaced, axis=0).ravel()
+
+                coordinates = np.empty(len(existing) + 4, dtype=np.float32)
+                coordinates[:-4] = existing
+                coordinates[-4:] = (start, old, end, new)
+                points.add(2)
+                points.foreach_set("co", coordinates)
+                # sorts the keyframes and works out their (auto) handles
+                fcurve.update()
+    if profiler.enabled:
+        profiler.count("strips animated", len(strips))
+
+
+class TransitionPreset:
+    """Lets a preset be animated over a number of frames rather than applied at once
+    (for mixing in with a TextSequenceAction)
+
+    Subclasses set _strip_attribute to the text strip attribute the preset
+    sets, _preset_attribute to the preset's property with the value for it
+    """
+
+    _strip_attribute = None
+    _preset_attribute = None
+
+    transition_frames: bpy.props.IntProperty(
+        name="Transition",
+        description="Number of frames to animate to the new value over (0 to change at once)",
+        default=0,
+        min=0,
+        soft_max=250,
+    )
+
+    @classmethod
+    def apply(cls, strip, preset):
+        """Apply preset (this operator or a keymap item's properties) to strip"""
+        cls.apply_all([strip], preset)
+
+    @classmethod
+    def apply_all(cls, strips, preset):
+        """Apply preset to each of strips, animating them all together if it has a transition"""
+        value = getattr(preset, cls._preset_attribute)
+        if getattr(preset, "transition_frames", 0) > 0:
+            animate_strips(strips, cls._strip_attribute, value, preset.transition_frames)
+        else:
+            for strip in strips:
+                setattr(strip, cls._strip_attribute, value)
+
+    @profiled
+    def execute(self, context):
+        self.apply_all([strip for strip in context.selected_editable_sequences
+                        if strip.type == "TEXT"], self)
+        return {'FINISHED'}
+
 
-class SetTextColour(TextSequenceAction):
+class SetTextColour(TransitionPreset, TextSequenceAction):
     """Set colour of text sequence[s]"""
     bl_idname = "sequencer.set_text_colour"
     bl_label = "Set Text Colour"
@@ -53,15 +339,11 @@ class SetTextColour(TextSequenceAction):
         default=(0.0, 0.0, 1.0, 1),  # blue in RGBA
         )
 
-    def execute(self, context):
-        for strip in bpy.context.selected_editable_sequences:
-            if strip.type == "TEXT":
-                strip.color = self.colour
-
-        return {'FINISHED'}
+    _strip_attribute = "color"
+    _preset_attribute = "colour"
 
 
-class SetTextLocation(TextSequenceAction):
+class SetTextLocation(TransitionPreset, TextSequenceAction):
     """Set location of text sequence[s]"""
     bl_idname = "sequencer.set_text_location"
     bl_label = "Set Text Location"
@@ -81,12 +363,8 @@ class SetTextLocation(TextSequenceAction):
         default=(0.5, 0.5)  # (x,y)
         )
 
-    def execute(self, context):
-        for strip in bpy.context.selected_editable_sequences:
-            if strip.type == "TEXT":
-                strip.location = self.location
-
-        return {'FINISHED'}
+    _strip_attribute = "location"
+    _preset_attribute = "location"
 
 
 class SetTextDuration(TextSequenceAction):
@@ -114,13 +392,23 @@ class SetTextDuration(TextSequenceAction):
         default=False,
     )
 
+    @staticmethod
+    def get_duration(duration, preset) -> int:
+        """Get what a strip's duration would be after applying preset"""
+        if not preset.relative:
+            return preset.duration
+        return duration + preset.duration
+
+    @classmethod
+    def apply(cls, strip, preset):
+        """Apply preset (this operator or a keymap item's properties) to strip"""
+        strip.frame_final_duration = cls.get_duration(strip.frame_final_duration, preset)
+
+    @profiled
     def execute(self, context):
         for strip in bpy.context.selected_editable_sequences:
             if strip.type == "TEXT":
-                if not self.relative:
-                    strip.frame_final_duration = self.duration
-                else:
-                    strip.frame_final_duration += self.duration
+                self.apply(strip, self)
 
         return {'FINISHED'}
 
@@ -149,17 +437,47 @@ class SetTextSize(TextSequenceAction):
         default=False,
     )
 
+    fit: bpy.props.BoolProperty(
+        name="Fit",
+        description="Use the largest size that fits the frame instead",
+        default=False,
+    )
+
+    fit_fraction: bpy.props.FloatProperty(
+        name="Fraction",
+        description="Fraction of the frame width/height text may take up when fitting",
+        subtype='FACTOR',
+        min=0.01,
+        max=1.0,
+        default=0.9,
+    )
+
+    @staticmethod
+    def apply(strip, preset):
+        """Apply preset (this operator or a keymap item's properties) to strip"""
+        if preset.fit:
+            if strip.text:
+                strip.font_size = fit_strip_font_size(strip, preset.fit_fraction,
+                                                      preset.fit_fraction)
+        elif not preset.relative:
+            strip.font_size = preset.size
+        else:
+            strip.font_size += preset.size
+
+    @profiled
     def execute(self, context):
         for strip in bpy.context.selected_editable_sequences:
             if strip.type == "TEXT":
-                if not self.relative:
-                    strip.font_size = self.size
-                else:
-                    strip.font_size += self.size
+                self.apply(strip, self)
 
         return {'FINISHED'}
 
 
+# Operators which presets (ie keymap items) can be made for
+PRESET_OPERATORS = {operator.bl_idname: operator for operator in
+                    (SetTextColour, SetTextLocation, SetTextSize, SetTextDuration)}
+
+
 class SAMPLE_OT_DirtyKeymap(bpy.types.Operator):
     """Borrowed operator for getting KeyMapInstance properties to apply"""
     bl_idname = "qte.sample_dirty_keymap"
@@ -174,19 +492,71 @@ class SAMPLE_OT_DirtyKeymap(bpy.types.Operator):
         return {'FINISHED'}
 
 
+def get_sequencer_keymap(context, create=False):
+    """Get the user keymap QTE keeps its presets in
+
+    Gives None if it doesn't exist (eg while Blender is starting up, or in
+    background mode) unless create is True"""
+    keyconfig = context.window_manager.keyconfigs.user
+    if keyconfig is None:
+        return None
+    km = keyconfig.keymaps.get(NewQTEPreset._keymap_id)
+    if km is None and create:
+        km = keyconfig.keymaps.new(NewQTEPreset._keymap_id,
+                                   space_type=NewQTEPreset._keymap_space_type)
+    return km
+
+
+def get_preset_groups(context) -> dict:
+    """{operator idname: [keymap items]} for every preset operator
+
+    This is one pass over the keymap. It isn't cached, as keymap items
+    can be freed (eg when the keyconfig is reloaded) without anything
+    telling QTE, and looking up cached ones costs as much as grouping
+    """
+    km = get_sequencer_keymap(context)
+    if km is None:
+        return {}
+    groups = {idname: [] for idname in PRESET_OPERATORS}
+    for kmi in km.keymap_items:
+        group = groups.get(kmi.idname)
+        if group is not None:
+            group.append(kmi)
+    return groups
+
+
+def find_preset(context, preset_id):
+    """Get the keymap item for preset_id (a keymap item id), or None"""
+    km = get_sequencer_keymap(context)
+    kmi = km.keymap_items.from_id(preset_id) if km is not None else None
+    return kmi if kmi is not None and kmi.idname in PRESET_OPERATORS else None
+
+
 class NewQTEPreset():
-    """Common actions for presets (shouldn't be used directly)"""
+    """Common actions for presets (shouldn't be used directly)
+
+    Subclasses set _operator to the operator the preset is for, and
+    _draw_properties to the properties shown for it in the preferences
+    """
 
     _keymap_id = 'SequencerCommon'
     _keymap_space_type = 'SEQUENCE_EDITOR'
+    _operator = None
+    _draw_properties = ("name",)
 
     def get_keymap(self, context):
         """Get sequencer keymap"""
-        km = context.window_manager.keyconfigs.user.keymaps
-        skm = km.get(self._keymap_id)
-        if not skm:
-            skm = km.new(self._keymap_id, self._keymap_space_type)
-        return skm
+        return get_sequencer_keymap(context, create=True)
+
+    def newkeymapitem(self, context):
+        # A new keymap item's properties start at the operator's defaults
+        return self.get_keymap(context).keymap_items.new(self._operator.bl_idname,
+                                                         'F5', 'PRESS')
+
+    def execute(self, context):
+        self.newkeymapitem(context)
+
+        return {'FINISHED'}
 
 
 class NewQTEColourPreset(bpy.types.Operator, NewQTEPreset):
@@ -194,35 +564,44 @@ class NewQTEColourPreset(bpy.types.Operator, NewQTEPreset):
     bl_idname = "qte.new_colour_preset"
     bl_label = "Add colour preset"
 
-    def newkeymapitem(self, context):
-        wm = context.window_manager
-        km = wm.keyconfigs.user.keymaps.get("SequencerCommon")
-        if km is None:
-            km = wm.keyconfigs.user.keymaps.new(
-                "SequencerCommon", space_type='SEQUENCE_EDITOR')
-
-        kmi = km.keymap_items.new("sequencer.set_text_colour", 'F5', 'PRESS')
-        opattrs = getattr(bpy.types,
-                          bpy.ops.sequencer.set_text_colour.idname()
-                          ).__annotations__
-        # The intent here is to get the attributes defined in the operator
-        # class; it feels awkward and there may be a better way, but at
-        # least *appears* to work
-        #
-        # See also:
-        # https://blender.stackexchange.com/questions/216211/how-to-get-operator-defaults
-        # https://developer.blender.org/T87465
-        kmi.properties.colour = opattrs['colour'].keywords['default']
-        kmi.properties.name = opattrs['name'].keywords['name']
-
-        return kmi
+    _operator = SetTextColour
+    _draw_properties = ("name", "colour", "transition_frames")
 
-    def execute(self, context):
-        self.newkeymapitem(context)
 
-        return {'FINISHED'}
+class NewQTELocationPreset(bpy.types.Operator, NewQTEPreset):
+    """Create a new QTE location preset"""
+    bl_idname = "qte.new_location_preset"
+    bl_label = "Add location preset"
+
+    _operator = SetTextLocation
+    _draw_properties = ("name", "location", "transition_frames")
+
+
+class NewQTESizePreset(bpy.types.Operator, NewQTEPreset):
+    """Create a new QTE size preset"""
+    bl_idname = "qte.new_size_preset"
+    bl_label = "Add size preset"
+
+    _operator = SetTextSize
+    _draw_properties = ("name", "size", "relative", "fit", "fit_fraction")
+
+
+class NewQTEDurationPreset(bpy.types.Operator, NewQTEPreset):
+    """Create a new QTE duration preset"""
+    bl_idname = "qte.new_duration_preset"
+    bl_label = "Add duration preset"
+
+    _operator = SetTextDuration
+    _draw_properties = ("name", "duration", "relative")
 
 
+# The kinds of preset, in the order they're shown in the preferences
+PRESET_CREATORS = (NewQTEColourPreset, NewQTELocationPreset,
+                   NewQTESizePreset, NewQTEDurationPreset)
+
+
+# Presets are kept in keymap items (see above); these PropertyGroups are
+# only still registered so previously saved preferences load cleanly
 class LocationPresets(bpy.types.PropertyGroup):
     """A PropertyGroup to define the structure of user presets (locations)"""
     name: bpy.props.StringProperty(
@@ -242,33 +621,6 @@ class LocationPresets(bpy.types.PropertyGroup):
         )
 
 
-class NewQTELocationPreset(bpy.types.Operator):
-    """Create a new QTE location preset"""
-    bl_idname = "qte.new_location_preset"
-    bl_label = "Add location preset"
-
-    def newkeymapitem(self, context, preset):
-        wm = context.window_manager
-        km = wm.keyconfigs.user.keymaps.get("SequencerCommon")
-        if km is None:
-            km = wm.keyconfigs.user.keymaps.new(
-                "SequencerCommon", space_type='SEQUENCE_EDITOR')
-
-        kmi = km.keymap_items.new("sequencer.set_text_location", 'F5', 'PRESS')
-        kmi.properties.location = preset.location
-        kmi.properties.name = ""
-
-        return kmi
-
-    def execute(self, context):
-        # this could be refactored (see NewQTEColourPreset)
-        addonprefs = context.preferences.addons[__name__].preferences
-        newpreset = addonprefs.location_presets.add()
-        newpreset.keymapitemid = self.newkeymapitem(context, newpreset).id
-
-        return {'FINISHED'}
-
-
 class SizePresets(bpy.types.PropertyGroup):
     """A PropertyGroup to define the structure of user presets (sizes)"""
     name: bpy.props.StringProperty(
@@ -293,34 +645,6 @@ class SizePresets(bpy.types.PropertyGroup):
     )
 
 
-class NewQTESizePreset(bpy.types.Operator):
-    """Create a new QTE size preset"""
-    bl_idname = "qte.new_size_preset"
-    bl_label = "Add size preset"
-
-    def newkeymapitem(self, context, preset):
-        wm = context.window_manager
-        km = wm.keyconfigs.user.keymaps.get("SequencerCommon")
-        if km is None:
-            km = wm.keyconfigs.user.keymaps.new(
-                "SequencerCommon", space_type='SEQUENCE_EDITOR')
-
-        kmi = km.keymap_items.new("sequencer.set_text_size", 'F5', 'PRESS')
-        kmi.properties.size = preset.size
-        kmi.properties.name = ""
-        kmi.properties.relative = preset.relative
-
-        return kmi
-
-    def execute(self, context):
-        # this could be refactored (see NewQTEColourPreset)
-        addonprefs = context.preferences.addons[__name__].preferences
-        newpreset = addonprefs.size_presets.add()
-        newpreset.keymapitemid = self.newkeymapitem(context, newpreset).id
-
-        return {'FINISHED'}
-
-
 class DurationPresets(bpy.types.PropertyGroup):
     """A PropertyGroup to define the structure of user presets (durations)"""
     name: bpy.props.StringProperty(
@@ -349,69 +673,389 @@ class DurationPresets(bpy.types.PropertyGroup):
     )
 
 
-class NewQTEDurationPreset(bpy.types.Operator):
-    """Create a new QTE duration preset"""
-    bl_idname = "qte.new_duration_preset"
-    bl_label = "Add duration preset"
+class QTERemoveKeyMapItem(bpy.types.Operator):
+    """Remove a kemapitem by id"""
+    bl_idname = "qte.remove_keymapitem"
+    bl_label = "Remove KeyMapItem (by id)"
 
-    def newkeymapitem(self, context, preset):
-        wm = context.window_manager
-        km = wm.keyconfigs.user.keymaps.get("SequencerCommon")
-        if km is None:
-            km = wm.keyconfigs.user.keymaps.new(
-                "SequencerCommon", space_type='SEQUENCE_EDITOR')
+    id: bpy.props.IntProperty(
+        name="ID",
+    )
+
+    def execute(self, context):
+        km = get_sequencer_keymap(context)
+        kmi = km.keymap_items.from_id(self.id) if km is not None else None
+        if kmi is None:
+            self.report({"ERROR"}, f"No keymap item with id {self.id} to remove")
+            return {"CANCELLED"}
+
+        km.keymap_items.remove(kmi)
+
+        return {'FINISHED'}
+
+
+PRESETS_FILE_VERSION = 1
+# Keymap item attributes saved with each preset, for its key binding
+PRESET_KEY_ATTRIBUTES = ("type", "value", "any", "shift", "ctrl", "alt", "oskey",
+                         "key_modifier", "active")
+
+
+def preset_to_dict(kmi) -> dict:
+    """Get a preset (keymap item) as a JSON-friendly dict"""
+    properties = {}
+    for prop in kmi.properties.bl_rna.properties:
+        if prop.identifier == "rna_type":
+            continue
+        value = getattr(kmi.properties, prop.identifier)
+        properties[prop.identifier] = list(value) if getattr(prop, "is_array", False) else value
+    return {
+        "operator": kmi.idname,
+        "properties": properties,
+        "key": {attr: getattr(kmi, attr) for attr in PRESET_KEY_ATTRIBUTES},
+    }
+
+
+def export_presets(context, filepath) -> int:
+    """Write every QTE preset, with its key binding, to a JSON file; returns how many"""
+    presets = [preset_to_dict(kmi)
+               for kmis in get_preset_groups(context).values()
+               for kmi in kmis]
+    with open(filepath, "w", encoding="utf-8") as presets_file:
+        json.dump({"version": PRESETS_FILE_VERSION, "presets": presets}, presets_file, indent=1)
+    return len(presets)
+
+
+def read_presets_file(filepath) -> list:
+    """Get the presets in a file written by export_presets, as dicts like preset_to_dict's"""
+    with open(filepath, encoding="utf-8") as presets_file:
+        data = json.load(presets_file)
+    if not isinstance(data, dict) or not isinstance(data.get("presets"), list):
+        raise ValueError("not a QTE presets file")
+    version = data.get("version", PRESETS_FILE_VERSION)
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise ValueError(f"not a QTE presets file (version {version!r})")
+    if version > PRESETS_FILE_VERSION:
+        raise ValueError(f"presets file version {version} is newer than this QTE")
+    # checked up front, so a bad preset doesn't stop an import half way (after
+    # Replace Existing has removed the existing presets)
+    key_properties = bpy.types.KeyMapItem.bl_rna.properties
+    key_enums = {attr: {item.identifier for item in key_properties[attr].enum_items}
+                 for attr in ("type", "value", "key_modifier")}
+    for i, preset in enumerate(data["presets"]):
+        if (not isinstance(preset, dict) or not isinstance(preset.get("key", {}), dict)
+                or not isinstance(preset.get("properties", {}), dict)):
+            raise ValueError(f"preset {i} in the presets file isn't valid")
+        key = preset.get("key", {})
+        for attr in PRESET_KEY_ATTRIBUTES:
+            if attr not in key:
+                continue
+            if attr in key_enums:
+                valid = key[attr] in key_enums[attr]
+            else:
+                valid = isinstance(key[attr], (bool, int))
+            if not valid:
+                raise ValueError(f"preset {i} in the presets file has an invalid key "
+                                 f"{attr} ({key[attr]!r})")
+    return data["presets"]
 
-        kmi = km.keymap_items.new("sequencer.set_text_duration", 'F5', 'PRESS')
-        if not kmi:
-            self.report({'ERROR', "No KeyMapItem! f{kmi}"})
-        kmi.properties.duration = preset.duration
-        kmi.properties.relative = preset.relative
-        kmi.properties.name = preset.name
 
-        return kmi
+def import_presets(context, filepath, replace=False) -> int:
+    """Create presets from a file written by export_presets; returns how many
+
+    All keymap items are created in one pass, then the preferences are
+    marked as changed once. With
+    replace, existing QTE presets are removed first. Presets for unknown
+    operators and unknown properties are skipped
+    """
+    presets = read_presets_file(filepath)
+    km = get_sequencer_keymap(context, create=True)
+    if km is None:
+        raise ValueError("there is no user keyconfig to add presets to")
+    keymap_items = km.keymap_items
+    if replace:
+        for kmi in [kmi for kmi in keymap_items if kmi.idname in PRESET_OPERATORS]:
+            keymap_items.remove(kmi)
+
+    created = 0
+    for preset in presets:
+        if preset.get("operator") not in PRESET_OPERATORS:
+            continue
+        key = preset.get("key", {})
+        kmi = keymap_items.new(preset["operator"], key.get("type", 'F5'),
+                               key.get("value", 'PRESS'), any=key.get("any", False),
+                               shift=key.get("shift", False), ctrl=key.get("ctrl", False),
+                               alt=key.get("alt", False), oskey=key.get("oskey", False),
+                               key_modifier=key.get("key_modifier", 'NONE'))
+        kmi.active = key.get("active", True)
+        for name, value in preset.get("properties", {}).items():
+            try:
+                setattr(kmi.properties, name, value)
+            except (AttributeError, TypeError, ValueError):
+                # from a different version of QTE
+                continue
+        created += 1
+
+    # the equivalent of SAMPLE_OT_DirtyKeymap, once for the whole import
+    km.show_expanded_items = km.show_expanded_items
+    context.preferences.is_dirty = True
+    return created
+
+
+class QTE_OT_export_presets(bpy.types.Operator, ExportHelper):
+    """Save all QTE presets and their key bindings to a JSON file"""
+    bl_idname = "qte.export_presets"
+    bl_label = "Export Presets"
+
+    filename_ext = ".json"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.json",
+        options={'HIDDEN'},
+    )
 
     def execute(self, context):
-        # this could be refactored (see NewQTEColourPreset)
-        addonprefs = context.preferences.addons[__name__].preferences
-        newpreset = addonprefs.duration_presets.add()
-        newpreset.keymapitemid = self.newkeymapitem(context, newpreset).id
+        try:
+            count = export_presets(context, self.filepath)
+        except OSError as err:
+            self.report({"ERROR"}, f"Could not write {self.filepath}: {err}")
+            return {"CANCELLED"}
+        self.report({"INFO"}, f"Exported {count} presets")
+        return {'FINISHED'}
+
+
+class QTE_OT_import_presets(bpy.types.Operator, ImportHelper):
+    """Add QTE presets and their key bindings from a JSON file"""
+    bl_idname = "qte.import_presets"
+    bl_label = "Import Presets"
+
+    filename_ext = ".json"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.json",
+        options={'HIDDEN'},
+    )
+
+    replace: bpy.props.BoolProperty(
+        name="Replace Existing",
+        description="Remove all current presets first",
+        default=False,
+    )
 
+    def execute(self, context):
+        time_start = time.perf_counter()
+        try:
+            count = import_presets(context, self.filepath, self.replace)
+        except (OSError, ValueError) as err:
+            self.report({"ERROR"}, f"Could not import {self.filepath}: {err}")
+            return {"CANCELLED"}
+        self.report({"INFO"}, f"Imported {count} presets in "
+                    f"{time.perf_counter() - time_start:.3f}s")
         return {'FINISHED'}
 
 
-class QTERemoveKeyMapItem(bpy.types.Operator):
-    """Remove a kemapitem by id"""
-    bl_idname = "qte.remove_keymapitem"
-    bl_label = "Remove KeyMapItem (by id)"
+def get_preset_keymap_items(context, idname):
+    """Get the keymap items (ie presets) for the operator idname
 
-    id: bpy.props.IntProperty(
-        name="ID",
+    Gives an empty list if the keymap isn't there (yet)"""
+    return get_preset_groups(context).get(idname, [])
+
+
+def get_preset(context, idname, preset_id):
+    """Get the properties of preset preset_id (a keymap item id), or None"""
+    for kmi in get_preset_keymap_items(context, idname):
+        if kmi.id == preset_id:
+            return kmi.properties
+    return None
+
+
+# Blender needs Python to keep a reference to dynamic enum items, see
+# https://docs.blender.org/api/current/bpy.props.html#bpy.props.EnumProperty
+_preset_enum_items = {}
+
+
+def preset_enum_items(context, idname):
+    """EnumProperty items for choosing one of the presets for operator idname"""
+    items = [("NONE", "None", "Don't apply a preset")]
+    if context is not None:
+        for kmi in get_preset_keymap_items(context, idname):
+            items.append((str(kmi.id), kmi.properties.name or f"Preset {kmi.id}",
+                          f"Apply preset bound to {kmi.to_string()}"))
+    _preset_enum_items[idname] = items
+    return items
+
+
+def all_preset_enum_items(context):
+    """EnumProperty items for choosing any preset, of any type"""
+    items = []
+    if context is not None:
+        for idname, kmis in get_preset_groups(context).items():
+            operator = PRESET_OPERATORS[idname]
+            for kmi in kmis:
+                items.append((str(kmi.id),
+                              f"{operator.bl_label}: {kmi.properties.name or kmi.id}",
+                              f"Apply preset bound to {kmi.to_string()}"))
+    if not items:
+        items.append(("NONE", "No presets", "Add presets in the addon preferences"))
+    _preset_enum_items[None] = items
+    return items
+
+
+def find_matching_text_strips(sequences, channel_range=None, frame_range=None,
+                              name_pattern="", text_pattern="", include_muted=False):
+    """Get the text strips in sequences matching all of the given filters
+
+    channel_range and frame_range are inclusive (first, last) pairs; a
+    strip matches frame_range if it overlaps it. name_pattern is a
+    wildcard pattern (eg 'subtitle_*') and text_pattern a regular
+    expression searched for in the strip's text.
+
+    The channel and frame filters read every strip's values in bulk
+    with foreach_get, so only strips passing those are looked at one by one
+    """
+    count = len(sequences)
+    if count == 0:
+        return []
+    mask = np.ones(count, dtype=bool)
+    if channel_range is not None:
+        channels = np.empty(count, dtype=np.int32)
+        sequences.foreach_get("channel", channels)
+        mask &= (channels >= channel_range[0]) & (channels <= channel_range[1])
+    if frame_range is not None:
+        starts = np.empty(count, dtype=np.int32)
+        ends = np.empty(count, dtype=np.int32)
+        sequences.foreach_get("frame_final_start", starts)
+        sequences.foreach_get("frame_final_end", ends)
+        mask &= (starts <= frame_range[1]) & (ends > frame_range[0])
+    if not include_muted:
+        mutes = np.empty(count, dtype=bool)
+        sequences.foreach_get("mute", mutes)
+        mask &= ~mutes
+
+    text_re = re.compile(text_pattern) if text_pattern else None
+    matches = []
+    for i in np.flatnonzero(mask):
+        strip = sequences[int(i)]
+        if strip.type != 'TEXT':
+            continue
+        if name_pattern and not fnmatch.fnmatchcase(strip.name, name_pattern):
+            continue
+        if text_re is not None and not text_re.search(strip.text):
+            continue
+        matches.append(strip)
+    return matches
+
+
+class SEQUENCER_OT_apply_preset_to_matching(bpy.types.Operator):
+    """Apply a preset to every text strip matching some filters"""
+    bl_idname = "sequencer.apply_preset_to_matching"
+    bl_label = "Apply Preset to Matching Strips"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    preset: bpy.props.EnumProperty(
+        name="Preset",
+        description="Preset to apply",
+        items=lambda self, context: all_preset_enum_items(context),
     )
 
-    def __init__(self):
-        self._kmi = None
+    use_channel_range: bpy.props.BoolProperty(
+        name="Filter by Channel",
+        default=False,
+    )
+
+    channel_min: bpy.props.IntProperty(
+        name="First Channel",
+        default=1,
+        min=1,
+        max=MAX_CHANNEL,
+    )
+
+    channel_max: bpy.props.IntProperty(
+        name="Last Channel",
+        default=MAX_CHANNEL,
+        min=1,
+        max=MAX_CHANNEL,
+    )
+
+    use_frame_range: bpy.props.BoolProperty(
+        name="Filter by Frame Range",
+        default=False,
+    )
+
+    frame_start: bpy.props.IntProperty(
+        name="Start Frame",
+        description="Match strips overlapping this frame or later",
+        default=1,
+    )
+
+    frame_end: bpy.props.IntProperty(
+        name="End Frame",
+        description="Match strips overlapping this frame or earlier",
+        default=250,
+    )
+
+    name_pattern: bpy.props.StringProperty(
+        name="Name",
+        description="Only strips with names matching this wildcard pattern (eg subtitle_*)",
+    )
+
+    text_pattern: bpy.props.StringProperty(
+        name="Text",
+        description="Only strips with text matching this regular expression",
+    )
+
+    include_muted: bpy.props.BoolProperty(
+        name="Include Muted",
+        description="Also apply the preset to muted strips",
+        default=False,
+    )
 
-    def get_kmi_reference(self, context):
-        """Accessing the keymap while blender is starting up causes an error
+    @classmethod
+    def poll(cls, context):
+        return context.scene is not None and context.scene.sequence_editor is not None
 
-        So instead we can create it on demand here
-        """
-        if "SequencerCommon" in bpy.context.window_manager.keyconfigs.user.keymaps:
-            self._kmi = bpy.context.window_manager.\
-                keyconfigs.user.keymaps['SequencerCommon'].keymap_items
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
 
+    @profiled
     def execute(self, context):
-        if self.id is None:
-            raise ValueError("Please supply an id to remove!")
-        if self._kmi is None:
-            self.get_kmi_reference(context)
+        if self.preset == "NONE":
+            self.report({"ERROR"}, "No preset chosen")
+            return {"CANCELLED"}
+        kmi = find_preset(context, int(self.preset))
+        if kmi is None:
+            self.report({"ERROR"}, "Preset not found")
+            return {"CANCELLED"}
+
+        time_start = time.perf_counter()
+        try:
+            strips = find_matching_text_strips(
+                context.scene.sequence_editor.sequences_all,
+                channel_range=((self.channel_min, self.channel_max)
+                               if self.use_channel_range else None),
+                frame_range=((self.frame_start, self.frame_end)
+                             if self.use_frame_range else None),
+                name_pattern=self.name_pattern,
+                text_pattern=self.text_pattern,
+                include_muted=self.include_muted)
+        except re.error as err:
+            self.report({"ERROR"}, f"Invalid text pattern: {err}")
+            return {"CANCELLED"}
 
-        self._kmi.remove(self._kmi.from_id(self.id))
+        # Text strip properties aren't on the base Sequence type, so RNA can't
+        # write them in bulk over sequences_all; they're set one strip at a time
+        PRESET_OPERATORS[kmi.idname].apply_all(strips, kmi.properties)
 
+        self.report({"INFO"}, f"Applied preset to {len(strips)} strips in "
+                    f"{time.perf_counter() - time_start:.3f}s")
         return {'FINISHED'}
 
 
-class QTEPreferences(bpy.types.AddonPreferences, NewQTEPreset):
+def update_font_metrics_store(self, context):
+    """Glyph stores may now be somewhere else, or not wanted"""
+    clear_font_metrics()
+
+
+class QTEPreferences(bpy.types.AddonPreferences):
     """Draw preferences for QTE addon. This means an interface for:
     - the presets and their bindings
       - colors
@@ -419,8 +1063,8 @@ class QTEPreferences(bpy.types.AddonPreferences, NewQTEPreset):
       - sizes / relative size changes
       - durations / relative duration changes
     - a 'save bindings' button
+    - import/export of presets + bindings
     later:
-      - export presets + bindings
       - toggle panel[s]
     """
     bl_idname = __name__
@@ -429,100 +1073,671 @@ class QTEPreferences(bpy.types.AddonPreferences, NewQTEPreset):
     location_presets: bpy.props.CollectionProperty(type=LocationPresets)
     size_presets: bpy.props.CollectionProperty(type=SizePresets)
 
+    use_font_metrics_store: bpy.props.BoolProperty(
+        name="Keep font measurements on disk",
+        description="Remember the width of each character in each font and size between "
+        "sessions, so text doesn't have to be measured again",
+        default=True,
+        update=update_font_metrics_store,
+    )
+
+    font_metrics_directory: bpy.props.StringProperty(
+        name="Font measurements folder",
+        description="Where to keep font measurements (eg a shared folder, so they can be "
+        "used on several machines); leave empty for Blender's user config folder",
+        subtype='DIR_PATH',
+        update=update_font_metrics_store,
+    )
+
+    enable_profiling: bpy.props.BoolProperty(
+        name="Enable profiling",
+        description="Record timings and counts of expensive operations (see QTE sidebar tab)",
+        default=False,
+        update=update_profiling,
+    )
+
     def draw(self, context):
         layout = self.layout
 
-        # Colour presets
-        box = layout.box()
-        # Walk layouts in SequencerCommon keymap in user keymaps
-        # (for set_text_colour operator)
-        for kmi in [kmi for kmi in context.window_manager.keyconfigs.user
-                    .keymaps['SequencerCommon'].keymap_items.values()
-                    if kmi.idname == "sequencer.set_text_colour"]:
-            row = box.row()
-            row.prop(kmi.properties, "name")
-            row.prop(kmi.properties, "colour")
-            row.prop(kmi, "type", text="", full_event=True)
-            row.operator(
-                "qte.remove_keymapitem",
-                text="",
-                icon='X'
-            ).id = kmi.id
-
-        box.operator("qte.new_colour_preset", icon='ADD')
-
-        # Location presets
-        box = layout.box()
-        for kmi in [kmi for kmi in context.window_manager.keyconfigs.user
-                    .keymaps['SequencerCommon'].keymap_items.values()
-                    if kmi.idname == "sequencer.set_text_location"]:
-            row = box.row()
-            row.prop(kmi.properties, "name")
-            row.prop(kmi.properties, "location")
-            row.prop(kmi, "type", text="", full_event=True)
-            row.operator(
-                "qte.remove_keymapitem",
-                text="",
-                icon='X'
-            ).id = kmi.id
-
-        box.operator("qte.new_location_preset", icon='ADD')
-
-        # Size presets
-        box = layout.box()
-        for kmi in [kmi for kmi in context.window_manager.keyconfigs.user
-                    .keymaps['SequencerCommon'].keymap_items.values()
-                    if kmi.idname == "sequencer.set_text_size"]:
-            row = box.row()
-            row.prop(kmi.properties, "name")
-            row.prop(kmi.properties, "size")
-            row.prop(kmi.properties, "relative")
-            row.prop(kmi, "type", text="", full_event=True)
-            row.operator(
-                "qte.remove_keymapitem",
-                text="",
-                icon='X'
-            ).id = kmi.id
-
-        box.operator("qte.new_size_preset", icon='ADD')
-
-        # Duration presets
-        box = layout.box()
-        for kmi in [kmi for kmi in context.window_manager.keyconfigs.user
-                    .keymaps['SequencerCommon'].keymap_items.values()
-                    if kmi.idname == "sequencer.set_text_duration"]:
-            row = box.row()
-            row.prop(kmi.properties, "name")
-            row.prop(kmi.properties, "duration")
-            row.prop(kmi.properties, "relative")
-            row.prop(kmi, "type", text="", full_event=True)
-            row.operator(
-                "qte.remove_keymapitem",
-                text="",
-                icon='X'
-            ).id = kmi.id
-
-        box.operator("qte.new_duration_preset", icon='ADD')
+        # One box per kind of preset, listing the presets in the
+        # SequencerCommon user keymap then a button to add another
+        groups = get_preset_groups(context)
+        for creator in PRESET_CREATORS:
+            box = layout.box()
+            for kmi in groups.get(creator._operator.bl_idname, ()):
+                row = box.row()
+                for prop in creator._draw_properties:
+                    row.prop(kmi.properties, prop)
+                row.prop(kmi, "type", text="", full_event=True)
+                row.operator(
+                    "qte.remove_keymapitem",
+                    text="",
+                    icon='X'
+                ).id = kmi.id
+
+            box.operator(creator.bl_idname, icon='ADD')
+
+        row = layout.row()
+        row.operator("qte.import_presets", icon='IMPORT')
+        row.operator("qte.export_presets", icon='EXPORT')
+        layout.prop(self, "use_font_metrics_store")
+        if self.use_font_metrics_store:
+            layout.prop(self, "font_metrics_directory")
+        layout.prop(self, "enable_profiling")
 
 
 # END text sequence manipulation (colour/location/etc)
 
-# BEGIN split to appearing words
+# BEGIN font metrics
 
-# TODO: Ask question if it is common / good practice to 'pull out'
-# enum items this way
-aw_temporal_offset_options = [
-    ("Fixed", "Fixed Offset",
-     "New strips will be this number of frames / seconds ahead of previous strip"),
-    ("RelativeLength", "Offset relative to word length",
-     "Strips will adjust timing based on the length of the previous word \
-compared to the average (ie longer words = bigger gap)"),
-    ("ParentEqual", "Parent Duration (Equally-divided)",
-     "New strips will use the duration of the parent sentence strip \
-and appear at equally-distributed times"),
-    ("ParentRelativeLength", "Parent Duration (Relative to word length)",
-     "New strips will use the duration of the parent sentence strip \
-and appear at times proportional to the word length (longer words = bigger gap)"),
+# Upper bound on memoised (font, size, text) measurements
+FONT_METRICS_CACHE_SIZE = 4096
+
+# resolved font filepath -> blf font id
+_font_ids = {}
+# blf font id -> key for the font file's contents, naming its glyph store files
+_font_keys = {}
+
+
+def get_font_id(filepath=None) -> int:
+    """Given a (possibly relative) font filepath, get a blf fontid
+
+    Each font file is only loaded once; a strip using the built-in font
+    (ie no filepath) gets blf's default fontid of 0
+    """
+    if not filepath:
+        return 0
+    filepath = path.normpath(bpy.path.abspath(filepath))
+    fontid = _font_ids.get(filepath)
+    if fontid is None:
+        # this is a horrible workaround, see
+        # https://devtalk.blender.org/t/getting-a-font-from-fontid-or-fontid-from-vectorfont-textsequence/28183/2
+        # for more info
+        fontid = blf.load(filepath)
+        if profiler.enabled:
+            profiler.count("font loads")
+        if fontid == -1:
+            fontid = 0
+        else:
+            _font_keys[fontid] = get_font_key(filepath)
+        _font_ids[filepath] = fontid
+    return fontid
+
+
+def get_font_key(filepath=None) -> str:
+    """Identify a font by a hash of its file, or the built-in font by Blender version"""
+    if filepath is None:
+        return "builtin-" + re.sub(r"\W+", "_", bpy.app.version_string)
+    with open(filepath, "rb") as font_file:
+        return hashlib.sha1(font_file.read()).hexdigest()
+
+
+def get_font_metrics_directory():
+    """Folder for glyph store files, or None if they aren't to be kept"""
+    addon = bpy.context.preferences.addons.get(__name__)
+    preferences = addon.preferences if addon is not None else None
+    if preferences is not None and not preferences.use_font_metrics_store:
+        return None
+    if preferences is not None and preferences.font_metrics_directory:
+        return bpy.path.abspath(preferences.font_metrics_directory)
+    return bpy.utils.user_resource('CONFIG', path="qte_font_metrics")
+
+
+class GlyphStore:
+    """Measurements of the glyphs of one font at one size, which persist between sessions
+
+    For each character measured so far this keeps (in NumPy arrays sorted
+    by code point) its advance, ie how far the next character is from it,
+    and its width on its own. Text is then measured by looking up all of
+    its characters at once: the advances of all but the last, plus the
+    width of the last. Only characters not seen before are measured with
+    blf. Kerning is not taken into account. Heights are the height of the
+    font's tallest and deepest characters ("Ág|") at this size, whatever
+    the text, so every line of text in a font and size is the same height.
+
+    The arrays are read from and written to filepath (a .npz file), if
+    given; see save_glyph_stores
+    """
+
+    # measured after each character, to find its advance
+    REFERENCE = "|"
+
+    def __init__(self, fontid, size, filepath=None):
+        self.fontid = fontid
+        self.size = size
+        self.filepath = filepath
+        self.codepoints = np.empty(0, dtype=np.uint32)
+        self.advances = np.empty(0, dtype=np.float64)
+        self.widths = np.empty(0, dtype=np.float64)
+        self.line_height = None
+        self.dirty = False
+        if filepath is not None:
+            self.merge(*self.read(filepath))
+
+    @staticmethod
+    def read(filepath):
+        """Get (codepoints, advances, widths, line_height) from a store file, if it can be read"""
+        try:
+            with np.load(filepath) as stored:
+                return (stored["codepoints"], stored["advances"], stored["widths"],
+                        float(stored["line_height"]))
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            # not there (yet), or not a store file (eg cut short)
+            return np.empty(0, dtype=np.uint32), np.empty(0), np.empty(0), None
+
+    def merge(self, codepoints, advances, widths, line_height=None):
+        """Add measurements, keeping existing ones for characters already measured"""
+        if line_height is not None and self.line_height is None:
+            self.line_height = line_height
+        new = ~np.isin(codepoints, self.codepoints)
+        if not new.any():
+            return
+        codepoints = np.concatenate((self.codepoints, codepoints[new]))
+        order = np.argsort(codepoints, kind="stable")
+        self.codepoints = codepoints[order]
+        self.advances = np.concatenate((self.advances, advances[new]))[order]
+        self.widths = np.concatenate((self.widths, widths[new]))[order]
+
+    def measure(self, codepoints):
+        """Measure the given (unseen) characters with blf, and add them"""
+        if profiler.enabled:
+            profiler.count("glyph measurements", len(codepoints))
+        blf.size(self.fontid, self.size)
+        reference_width = blf.dimensions(self.fontid, self.REFERENCE)[0]
+        advances = np.empty(len(codepoints))
+        widths = np.empty(len(codepoints))
+        for i, codepoint in enumerate(codepoints):
+            char = chr(codepoint)
+            widths[i] = blf.dimensions(self.fontid, char)[0]
+            advances[i] = blf.dimensions(self.fontid, char + self.REFERENCE)[0] - reference_width
+        if self.line_height is None:
+            self.line_height = blf.dimensions(self.fontid, "Ág" + self.REFERENCE)[1]
+        self.merge(np.asarray(codepoints, dtype=np.uint32), advances, widths)
+        self.dirty = True
+
+    def dimensions(self, text):
+        """(width, height) of text in px, like blf.dimensions"""
+        if not text:
+            return 0.0, 0.0
+        codepoints = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        indexes = np.searchsorted(self.codepoints, codepoints)
+        found = indexes < len(self.codepoints)
+        found[found] = self.codepoints[indexes[found]] == codepoints[found]
+        if not found.all() or self.line_height is None:
+            self.measure(np.unique(codepoints[~found]))
+            indexes = np.searchsorted(self.codepoints, codepoints)
+        width = self.advances[indexes[:-1]].sum() + self.widths[indexes[-1]]
+        return float(width), self.line_height
+
+    def save(self):
+        """Write the measurements to filepath, along with any another session saved there"""
+        if self.filepath is None or not self.dirty:
+            return
+        self.merge(*self.read(self.filepath))
+        os.makedirs(path.dirname(self.filepath), exist_ok=True)
+        # write then rename, so nobody reads a half-written file
+        temp_filepath = f"{self.filepath}.{os.getpid()}.tmp.npz"
+        np.savez(temp_filepath, codepoints=self.codepoints, advances=self.advances,
+                 widths=self.widths, line_height=self.line_height)
+        os.replace(temp_filepath, self.filepath)
+        self.dirty = False
+
+
+# (fontid, size) -> GlyphStore
+_glyph_stores = {}
+
+
+def get_glyph_store(fontid, size) -> GlyphStore:
+    """Get the glyph store for a font at a size, reading it from disk if there is one"""
+    store = _glyph_stores.get((fontid, size))
+    if store is None:
+        if fontid not in _font_keys:
+            _font_keys[fontid] = get_font_key()
+        directory = get_font_metrics_directory()
+        filepath = None
+        if directory:
+            filepath = path.join(directory, f"{_font_keys[fontid]}_{size:.2f}.npz")
+        store = _glyph_stores[(fontid, size)] = GlyphStore(fontid, size, filepath)
+    return store
+
+
+def save_glyph_stores():
+    """Write out any glyph stores with new measurements"""
+    for store in _glyph_stores.values():
+        try:
+            store.save()
+        except OSError:
+            # eg a read-only shared folder; measuring again next time is fine
+            pass
+
+
+@functools.lru_cache(maxsize=FONT_METRICS_CACHE_SIZE)
+def _text_dimensions(fontid, size, text):
+    if profiler.enabled:
+        profiler.count("text measurements (uncached)")
+    return get_glyph_store(fontid, size).dimensions(text)
+
+
+def get_strip_font_id(strip) -> int:
+    """get a blf fontid for the font a text strip uses"""
+    font = strip.font
+    return get_font_id(font.filepath if font else None)
+
+
+def get_strip_text_size(strip, text=None):
+    """get the size of supplied text based on strip font in px"""
+    if profiler.enabled:
+        profiler.count("text measurements")
+    return _text_dimensions(get_strip_font_id(strip), strip.font_size, text)
+
+
+# Font size text is measured at (with a glyph store) to find the size that fits
+FIT_REFERENCE_SIZE = 100
+
+
+@functools.lru_cache(maxsize=FONT_METRICS_CACHE_SIZE)
+def _fit_probe_dimensions(fontid, size, text):
+    """(width, line height) of text measured with blf directly, not through a glyph store"""
+    if profiler.enabled:
+        profiler.count("font fit probes")
+    blf.size(fontid, size)
+    return (blf.dimensions(fontid, text)[0],
+            blf.dimensions(fontid, "Ág" + GlyphStore.REFERENCE)[1])
+
+
+def fit_font_size(fontid, text, max_width, max_height, min_size=1, max_size=2000) -> int:
+    """Get the largest whole font size at which text fits in max_width x max_height px
+
+    Text is measured once at FIT_REFERENCE_SIZE and the size scaled to
+    fit. Glyphs don't scale quite linearly, so the guess is then checked
+    and moved a size at a time, measuring with blf directly so that sizes
+    tried along the way don't get glyph stores (or files) of their own.
+    These measurements are memoised too, so fitting the same text again
+    takes no blf calls. If even min_size doesn't fit, min_size is returned
+    """
+    width, height = _text_dimensions(fontid, FIT_REFERENCE_SIZE, text)
+    if width <= 0 or height <= 0:
+        return max_size
+
+    def fits(size):
+        probe_width, probe_height = _fit_probe_dimensions(fontid, size, text)
+        return probe_width <= max_width and probe_height <= max_height
+
+    scale = min(max_width / width, max_height / height)
+    size = min(max(int(FIT_REFERENCE_SIZE * scale), min_size), max_size)
+    while size > min_size and not fits(size):
+        size -= 1
+    while size < max_size and fits(size + 1):
+        size += 1
+    return size
+
+
+def fit_strip_font_size(strip, width_fraction=0.9, height_fraction=0.9) -> int:
+    """Get the largest font size for strip's text to fit the given fraction of the frame"""
+    render = strip.id_data.render
+    return fit_font_size(get_strip_font_id(strip), strip.text,
+                         render.resolution_x * width_fraction,
+                         render.resolution_y * height_fraction)
+
+
+class SEQUENCER_OT_fit_text_to_frame(bpy.types.Operator):
+    """Set each selected text strip to the largest font size that fits the frame"""
+    bl_idname = "sequencer.fit_text_to_frame"
+    bl_label = "Fit Text to Frame"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    width_fraction: bpy.props.FloatProperty(
+        name="Width",
+        description="Fraction of the frame width text may take up",
+        subtype='FACTOR',
+        min=0.01,
+        max=1.0,
+        default=0.9,
+    )
+
+    height_fraction: bpy.props.FloatProperty(
+        name="Height",
+        description="Fraction of the frame height text may take up",
+        subtype='FACTOR',
+        min=0.01,
+        max=1.0,
+        default=0.9,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return (context.scene and context.scene.sequence_editor
+                and context.selected_editable_sequences is not None)
+
+    @profiled
+    def execute(self, context):
+        strips = [strip for strip in context.selected_editable_sequences
+                  if strip.type == 'TEXT' and strip.text]
+        for strip in strips:
+            strip.font_size = fit_strip_font_size(strip, self.width_fraction,
+                                                  self.height_fraction)
+        self.report({"INFO"}, f"Fitted {len(strips)} text strips")
+        return {'FINISHED'}
+
+
+def clear_font_metrics():
+    """Save any new glyph measurements, then forget loaded font ids and measurements"""
+    save_glyph_stores()
+    _glyph_stores.clear()
+    _font_ids.clear()
+    _font_keys.clear()
+    _text_dimensions.cache_clear()
+    _fit_probe_dimensions.cache_clear()
+
+
+@persistent
+def clear_font_metrics_handler(*args):
+    """Font files may differ (or be reloaded) once another .blend is loaded"""
+    clear_font_metrics()
+
+
+# END font metrics
+
+# BEGIN text strip index
+
+
+class IntervalTree:
+    """A static (centred) interval tree of half-open [start, end) intervals
+
+    Each node holds the intervals containing its centre, sorted both by
+    start and by end, so a query only scans intervals it will return
+    plus one path down the tree
+    """
+
+    def __init__(self, intervals):
+        """intervals is an iterable of (start, end, value)"""
+        self._root = self._build([interval for interval in intervals
+                                  if interval[1] > interval[0]])
+
+    @classmethod
+    def _build(cls, intervals):
+        if not intervals:
+            return None
+        intervals.sort(key=lambda interval: interval[0])
+        # the median start is inside its own interval, so every node is non-empty
+        centre = intervals[len(intervals) // 2][0]
+        left, here, right = [], [], []
+        for interval in intervals:
+            if interval[1] <= centre:
+                left.append(interval)
+            elif interval[0] > centre:
+                right.append(interval)
+            else:
+                here.append(interval)
+        by_end = sorted(here, key=lambda interval: interval[1], reverse=True)
+        return (centre, here, by_end, cls._build(left), cls._build(right))
+
+    def overlapping(self, start, end):
+        """Values of intervals overlapping [start, end)"""
+        found = []
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            if node is None:
+                continue
+            centre, by_start, by_end, left, right = node
+            if end <= centre:
+                for interval in by_start:
+                    if interval[0] >= end:
+                        break
+                    found.append(interval[2])
+                nodes.append(left)
+            elif start > centre:
+                for interval in by_end:
+                    if interval[1] <= start:
+                        break
+                    found.append(interval[2])
+                nodes.append(right)
+            else:
+                found.extend(interval[2] for interval in by_start)
+                nodes.append(left)
+                nodes.append(right)
+        return found
+
+    def at(self, frame):
+        """Values of intervals containing frame"""
+        return self.overlapping(frame, frame + 1)
+
+
+class TextStripIndex:
+    """Per-scene index of text strips, by channel and by frame interval
+
+    An index is built the first time a scene is queried, and thrown away
+    by the handlers below whenever the scene (or the whole file) may
+    have changed. It stores strip names rather than strips, since Python
+    references to strips don't survive undo; deleted strips are skipped
+    """
+
+    def __init__(self):
+        self._scenes = {}
+
+    def invalidate(self, scene=None):
+        """Forget the index for scene, or for all scenes"""
+        if scene is None:
+            self._scenes.clear()
+        else:
+            self._scenes.pop(scene.as_pointer(), None)
+
+    def _get(self, scene):
+        key = scene.as_pointer()
+        index = self._scenes.get(key)
+        if index is None:
+            by_channel = {}
+            intervals = []
+            if scene.sequence_editor is not None:
+                for strip in scene.sequence_editor.sequences_all:
+                    if strip.type != 'TEXT':
+                        continue
+                    span = (strip.frame_final_start, strip.frame_final_end, strip.name)
+                    by_channel.setdefault(strip.channel, []).append(span)
+                    intervals.append(span)
+            for spans in by_channel.values():
+                spans.sort()
+            index = self._scenes[key] = (by_channel, IntervalTree(intervals))
+        return index
+
+    @staticmethod
+    def _resolve(scene, names):
+        sequences = scene.sequence_editor.sequences_all
+        strips = (sequences.get(name) for name in names)
+        return [strip for strip in strips if strip is not None]
+
+    def in_channel(self, scene, channel):
+        """Text strips in channel, in time order"""
+        by_channel, _ = self._get(scene)
+        return self._resolve(scene, [span[2] for span in by_channel.get(channel, ())])
+
+    def in_range(self, scene, start, end):
+        """Text strips overlapping frames [start, end)"""
+        _, tree = self._get(scene)
+        return self._resolve(scene, tree.overlapping(start, end))
+
+    def at_frame(self, scene, frame):
+        """Text strips showing at frame"""
+        _, tree = self._get(scene)
+        return self._resolve(scene, tree.at(frame))
+
+
+text_strip_index = TextStripIndex()
+
+
+@persistent
+def text_strip_index_depsgraph_handler(scene, depsgraph=None):
+    """Strips may have been added, removed or moved"""
+    if depsgraph is None or depsgraph.id_type_updated('SCENE'):
+        text_strip_index.invalidate(scene)
+
+
+@persistent
+def text_strip_index_reset_handler(*args):
+    """After loading a file or undo/redo, no old index can be trusted"""
+    text_strip_index.invalidate()
+
+
+# END text strip index
+
+# BEGIN collision checking
+
+def find_collisions(boxes):
+    """Find every pair of boxes which overlap both in time and on screen
+
+    boxes is a sequence of (frame_start, frame_end, x0, y0, x1, y1), with
+    frames half-open like frame_final_start/frame_final_end. Returns a
+    list of (i, j) index pairs, i < j.
+
+    This sweeps through time once (sorting is O(n log n)), keeping the
+    boxes showing at the current frame in a heap by end frame and a list
+    sorted by x0, so each new box only has to be compared with showing
+    boxes which start to the left of its right edge
+    """
+    order = sorted(range(len(boxes)), key=lambda i: boxes[i][0])
+    ending = []  # heap of (frame_end, index) for the boxes showing
+    showing_x0 = []
+    showing = []
+    pairs = []
+    for i in order:
+        frame_start, _, x0, y0, x1, y1 = boxes[i]
+        while ending and ending[0][0] <= frame_start:
+            _, gone = heapq.heappop(ending)
+            position = bisect.bisect_left(showing_x0, boxes[gone][2])
+            while showing[position] != gone:
+                position += 1
+            del showing_x0[position]
+            del showing[position]
+
+        for j in showing[:bisect.bisect_left(showing_x0, x1)]:
+            _, _, other_x0, other_y0, other_x1, other_y1 = boxes[j]
+            if other_x1 > x0 and other_y0 < y1 and other_y1 > y0:
+                pairs.append((min(i, j), max(i, j)))
+
+        heapq.heappush(ending, (boxes[i][1], i))
+        position = bisect.bisect_right(showing_x0, x0)
+        showing_x0.insert(position, x0)
+        showing.insert(position, i)
+    return pairs
+
+
+def get_text_strip_box(strip, rez_x, rez_y):
+    """Get the on-screen bounding box of a text strip's text, (x0, y0, x1, y1) in px
+
+    This uses the cached font metrics and takes the strip's alignment and
+    word wrapping into account (wrapped lines are assumed to be full)
+    """
+    width, height = get_strip_text_size(strip, text=strip.text)
+    if strip.wrap_width > 0 and width > strip.wrap_width * rez_x:
+        wrap_px = strip.wrap_width * rez_x
+        height *= math.ceil(width / wrap_px)
+        width = wrap_px
+    x = (strip.location[0] * rez_x
+         - width * {"LEFT": 0.0, "CENTER": 0.5, "RIGHT": 1.0}[strip.align_x])
+    y = (strip.location[1] * rez_y
+         - height * {"BOTTOM": 0.0, "CENTER": 0.5, "TOP": 1.0}[strip.align_y])
+    return x, y, x + width, y + height
+
+
+class SEQUENCER_OT_check_text_collisions(bpy.types.Operator):
+    """Find (unmuted) text strips which are shown at the same time and overlap on screen"""
+    bl_idname = "sequencer.check_text_collisions"
+    bl_label = "Check Text Collisions"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    select: bpy.props.BoolProperty(
+        name="Select",
+        description="Select the colliding strips (and deselect all others)",
+        default=True,
+    )
+
+    margin: bpy.props.IntProperty(
+        name="Margin (px)",
+        description="Count text closer than this as colliding too",
+        default=0,
+        min=0,
+        soft_max=100,
+    )
+
+    # how many colliding pairs to list individually
+    max_reported = 10
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene and context.scene.sequence_editor
+
+    @profiled
+    def execute(self, context):
+        scene = context.scene
+        sequences_all = scene.sequence_editor.sequences_all
+        rez_x, rez_y = scene.render.resolution_x, scene.render.resolution_y
+        strips = [strip for strip in find_matching_text_strips(sequences_all) if strip.text]
+
+        boxes = []
+        for strip in strips:
+            x0, y0, x1, y1 = get_text_strip_box(strip, rez_x, rez_y)
+            boxes.append((strip.frame_final_start, strip.frame_final_end,
+                          x0 - self.margin, y0 - self.margin, x1 + self.margin, y1 + self.margin))
+        pairs = find_collisions(boxes)
+
+        offenders = {index for pair in pairs for index in pair}
+        if self.select:
+            for strip in sequences_all:
+                strip.select = False
+            for index in offenders:
+                strips[index].select = True
+
+        if not pairs:
+            self.report({"INFO"}, f"No collisions between {len(strips)} text strips")
+            return {'FINISHED'}
+        for i, j in pairs[:self.max_reported]:
+            self.report({"WARNING"}, f"{strips[i].name} collides with {strips[j].name} "
+                        f"(frames {max(boxes[i][0], boxes[j][0])}-{min(boxes[i][1], boxes[j][1])})")
+        self.report({"WARNING"}, f"{len(pairs)} collisions between {len(offenders)} "
+                    f"of {len(strips)} text strips")
+        return {'FINISHED'}
+
+
+# END collision checking
+
+# BEGIN split to appearing words
+
+# TODO: Ask question if it is common / good practice to 'pull out'
+# enum items this way
+aw_temporal_offset_options = [
+    ("Fixed", "Fixed Offset",
+     "New strips will be this number of frames / seconds ahead of previous strip"),
+    ("RelativeLength", "Offset relative to word length",
+     "Strips will adjust timing based on the length of the previous word \
+compared to the average (ie longer words = bigger gap)"),
+    ("ParentEqual", "Parent Duration (Equally-divided)",
+     "New strips will use the duration of the parent sentence strip \
+and appear at equally-distributed times"),
+    ("ParentRelativeLength", "Parent Duration (Relative to word length)",
+     "New strips will use the duration of the parent sentence strip \
+and appear at times proportional to the word length (longer words = bigger gap)"),
+    ("WordTimings", "Word timings file",
+     "New strips will appear when their word is said, according to a file of word \
+timings (eg from a forced aligner) in JSON, CSV or WebVTT format"),
+]
+
+
+aw_line_break_options = [
+    ("NONE", "Single line", "Put every word on one line"),
+    ("GREEDY", "Greedy", "Fill each line with as many words as fit, then start the next"),
+    ("OPTIMAL", "Balanced",
+     "Choose line breaks which make the lines as even as possible (like TeX)"),
+]
+
+
+aw_output_mode_options = [
+    ("Words", "Strip per word",
+     "Each word gets its own strip, which lasts until the end of the sentence"),
+    ("Cumulative", "Cumulative reveal",
+     "Each step gets a strip with the text so far, lasting until the next word appears; \
+only one strip shows at a time, which is cheaper to render (extra word spacing is not used, \
+and words only stay in place with left-aligned text)"),
 ]
 
 
@@ -536,7 +1751,7 @@ class AppearingWordsOptions(bpy.types.PropertyGroup):
     """
 
     def get_fps(self):
-        return float(bpy.context.scene.render.fps / bpy.context.scene.render.fps_base)
+        return get_fps(bpy.context.scene)
 
     def update_frames_from_time(self, context):
         """When time offset changes, update the frame gap to match (based on FPS)"""
@@ -573,6 +1788,13 @@ class AppearingWordsOptions(bpy.types.PropertyGroup):
         items=aw_temporal_offset_options,
     )
 
+    word_timings_path: bpy.props.StringProperty(
+        name="Word timings",
+        description="JSON, CSV or WebVTT file with the time each word is said, "
+        "relative to the scene's start frame",
+        subtype='FILE_PATH',
+    )
+
     extra_word_spacing: bpy.props.FloatProperty(
         name="Extra word spacing",
         description="Increase or decrease horizontal space between words",
@@ -580,15 +1802,663 @@ class AppearingWordsOptions(bpy.types.PropertyGroup):
         soft_min=-3.0, soft_max=3.0,
     )
 
+    output_mode: bpy.props.EnumProperty(
+        name="Output",
+        description="What strips to create",
+        items=aw_output_mode_options,
+    )
 
-class SEQUENCER_OT_split_to_appearing_words(TextSequenceAction):
-    """Split the text in a text sequence to several text sequences
+    line_break: bpy.props.EnumProperty(
+        name="Lines",
+        description="How to break words onto lines",
+        items=aw_line_break_options,
+        default="NONE",
+    )
 
-    The words should appear one after another in both time and space"""
+    line_margin: bpy.props.FloatProperty(
+        name="Right margin",
+        description="Space to leave on the right of each line, as a fraction of the frame width",
+        default=0.05,
+        min=0.0, max=0.9,
+        subtype='FACTOR',
+    )
 
-    bl_label = "Convert to appearing words"
-    bl_idname = "sequencer.split_to_appearing_words"
-    bl_options = {'REGISTER', 'UNDO'}
+    line_spacing: bpy.props.FloatProperty(
+        name="Line spacing",
+        description="Distance between lines, relative to the height of the text",
+        default=1.2,
+        min=0.5, soft_max=3.0,
+    )
+
+    use_meta: bpy.props.BoolProperty(
+        name="Group in meta strip",
+        description="Put the strips created for each sentence in a meta strip, "
+        "so it can be selected and moved as one",
+        default=False,
+    )
+
+    meta_include_parent: bpy.props.BoolProperty(
+        name="Include original",
+        description="Put the original (muted) sentence strip in the meta strip too",
+        default=True,
+    )
+
+
+# BEGIN appearing words layout
+#
+# Nothing in this section touches bpy, so the maths can be checked with
+# plain Python + NumPy (see tests/test_layout.py)
+
+
+def break_lines(word_widths, space_width, max_width, mode="GREEDY"):
+    """Work out which line each word goes on, so lines are at most max_width wide
+
+    Widths are in px; mode is one of aw_line_break_options. A word wider
+    than max_width gets a line to itself. "OPTIMAL" minimises the sum of
+    the squared space left at the end of each line but the last, like
+    Knuth-Plass without hyphenation. As a line can only hold so many
+    words, both modes take time linear in the number of words.
+    Returns a NumPy array of line numbers, one per word
+    """
+    widths = [float(width) for width in word_widths]
+    word_count = len(widths)
+    if mode == "NONE" or word_count == 0:
+        return np.zeros(word_count, dtype=np.int64)
+
+    if mode == "GREEDY":
+        lines = [0]
+        line, line_width = 0, widths[0]
+        for width in widths[1:]:
+            if line_width + space_width + width > max_width:
+                line, line_width = line + 1, width
+            else:
+                line_width += space_width + width
+            lines.append(line)
+        return np.array(lines, dtype=np.int64)
+
+    if mode != "OPTIMAL":
+        raise ValueError(f"Unknown line break mode: {mode}")
+
+    # cost[j] is the least cost of setting the first j words, the last
+    # line of which starts at word line_start[j]
+    prefix = [0.0, *itertools.accumulate(widths)]
+    cost = [0.0] + [float("inf")] * word_count
+    line_start = [0] * (word_count + 1)
+    for j in range(1, word_count + 1):
+        for i in range(j - 1, -1, -1):
+            line_width = prefix[j] - prefix[i] + (j - i - 1) * space_width
+            if line_width > max_width and i < j - 1:
+                break
+            slack = max(max_width - line_width, 0.0)
+            line_cost = cost[i] + (0.0 if j == word_count else slack * slack)
+            if line_cost < cost[j]:
+                cost[j], line_start[j] = line_cost, i
+
+    starts = []
+    j = word_count
+    while j > 0:
+        starts.append(line_start[j])
+        j = line_start[j]
+    starts.reverse()
+    lines = np.zeros(word_count, dtype=np.int64)
+    lines[starts[1:]] = 1
+    return np.cumsum(lines)
+
+
+def layout_appearing_words(word_lengths, word_widths, space_width, parent_duration,
+                           offset_type="Fixed", frame_offset=1, extra_word_spacing=0.0,
+                           frame_start=0, location_x=0.0, rez_x=1920, line_numbers=None,
+                           word_starts=None):
+    """Work out when and where each word of a split text strip appears
+
+    word_lengths are in characters, word_widths and space_width in px;
+    offset_type is one of aw_temporal_offset_options. "WordTimings" needs
+    the start frame of each word in word_starts (eg from
+    match_word_timings). line_numbers (eg from break_lines) puts the first
+    word of each line back at location_x. Returns a pair of NumPy arrays:
+    the start frame of each word, and its x location (as a fraction of
+    rez_x)
+    """
+    lengths = np.asarray(word_lengths, dtype=np.float64)
+    widths = np.asarray(word_widths, dtype=np.float64)
+    word_count = len(lengths)
+    average_word_length = lengths.sum() / word_count
+    # the gap after each word (bar the last) is based on that word
+    previous_lengths = lengths[:-1]
+
+    if offset_type == "WordTimings":
+        if word_starts is None:
+            raise ValueError("Word timings are needed to time words from them")
+        offsets = None
+    elif offset_type == "Fixed":
+        # All fixed offset
+        offsets = np.full(word_count - 1, frame_offset, dtype=np.float64)
+    elif offset_type == "RelativeLength":
+        # relative to the 'fixed offset', some will be shorter and some will be longer
+        # based on the length of word compared to average
+        offsets = frame_offset * (previous_lengths / average_word_length)
+    elif offset_type == "ParentEqual":
+        # All the same but based on parent duration
+        offsets = np.full(word_count - 1, int(parent_duration / word_count), dtype=np.float64)
+    elif offset_type == "ParentRelativeLength":
+        # Relative to parent duration but modified by previous word length
+        # eg 'of' (short) 'farce' (medium) 'narrativism' (long)
+        # use average from 'ParentEqual' multipled by wordlength/averagelength
+        offsets = int(parent_duration / word_count) * (previous_lengths / average_word_length)
+    else:
+        raise ValueError(f"Unknown temporal offset type: {offset_type}")
+
+    if offsets is None:
+        # words can't appear before the strip starts, or before the previous word
+        frame_starts = np.maximum.accumulate(
+            np.maximum(np.asarray(word_starts, dtype=np.int64), int(frame_start)))
+    else:
+        # Each word starts a whole number of frames after the previous one; as the
+        # previous start is whole, int(previous + offset) == previous + floor(offset)
+        frame_starts = int(frame_start) + np.concatenate(
+            ([0], np.cumsum(np.floor(offsets)))).astype(np.int64)
+    # a strip needs to be at least one frame long
+    frame_starts = np.minimum(frame_starts, int(frame_start) + int(parent_duration) - 1)
+
+    # Each word is placed after the previous word
+    #  + previous word width
+    #  + width of space
+    #  + extra spacing specified by user
+    advances = (widths[:-1] + space_width * (1.0 + extra_word_spacing)) / rez_x
+    offsets = np.concatenate(([0.0], np.cumsum(advances)))
+    if line_numbers is not None:
+        # measure from the first word of each word's line
+        line_numbers = np.asarray(line_numbers, dtype=np.int64)
+        first_words = np.flatnonzero(np.diff(line_numbers, prepend=-1))
+        offsets -= offsets[first_words][line_numbers]
+    location_xs = location_x + offsets
+
+    return frame_starts, location_xs
+
+
+# END appearing words layout
+
+# BEGIN channel allocation
+
+class ChannelAllocator:
+    """Packs new strips into the lowest free channels above a given one
+
+    For each channel this keeps the occupied frame ranges ([start, end),
+    like frame_final_start/frame_final_end) sorted by start. Strips in a
+    channel cannot overlap, so the ends are sorted too and checking if a
+    range is free is a binary search
+    """
+
+    def __init__(self, spans=()):
+        self._starts = {}
+        self._ends = {}
+        for channel, start, end in spans:
+            self.occupy(channel, start, end)
+
+    @classmethod
+    def from_sequences(cls, sequences):
+        """Build an allocator from the strips already in sequences"""
+        return cls((strip.channel, strip.frame_final_start, strip.frame_final_end)
+                   for strip in sequences)
+
+    def is_free(self, channel, start, end) -> bool:
+        """Is [start, end) unoccupied in channel?"""
+        starts = self._starts.get(channel)
+        if not starts:
+            return True
+        # only the last span starting before end can reach past start
+        i = bisect.bisect_left(starts, end)
+        return i == 0 or self._ends[channel][i-1] <= start
+
+    def occupy(self, channel, start, end):
+        """Mark [start, end) in channel as used"""
+        starts = self._starts.setdefault(channel, [])
+        ends = self._ends.setdefault(channel, [])
+        i = bisect.bisect_left(starts, start)
+        starts.insert(i, start)
+        ends.insert(i, end)
+
+    def release(self, channel, start, end):
+        """Mark [start, end) in channel as free again (it must have been occupied)"""
+        starts = self._starts.get(channel, [])
+        ends = self._ends.get(channel, [])
+        i = bisect.bisect_left(starts, start)
+        while i < len(starts) and starts[i] == start:
+            if ends[i] == end:
+                del starts[i]
+                del ends[i]
+                return
+            i += 1
+        raise ValueError(f"Frames {start}-{end} are not occupied in channel {channel}")
+
+    def allocate(self, start, end, min_channel=1) -> int:
+        """Get (and occupy) the lowest channel >= min_channel free for [start, end)"""
+        for channel in range(min_channel, MAX_CHANNEL + 1):
+            if self.is_free(channel, start, end):
+                self.occupy(channel, start, end)
+                return channel
+        raise ValueError(f"No free channel between {min_channel} and {MAX_CHANNEL} "
+                         f"for frames {start}-{end}")
+
+
+# END channel allocation
+
+# Style attributes a created strip inherits from its parent text strip;
+# some only exist in later Blender versions, so are skipped if missing
+TEXT_STYLE_ATTRIBUTES = ("font", "font_size", "use_bold", "use_italic",
+                         "color", "use_shadow", "shadow_color",
+                         "use_box", "box_color", "box_margin",
+                         "align_x", "align_y", "location", "wrap_width",
+                         "blend_type", "blend_alpha")
+
+
+def get_container(sequence):
+    """Get the sequences sequence is in: its meta strip's, or the scene's top level"""
+    meta = sequence.parent_meta()
+    return meta.sequences if meta is not None else sequence.id_data.sequence_editor.sequences
+
+
+def get_container_allocator(sequence, allocators):
+    """Get the ChannelAllocator for the sequences sequence is in
+
+    allocators is a dict of them (by meta strip name, or None for the top
+    level), which a new allocator is added to
+    """
+    meta = sequence.parent_meta()
+    key = meta.name if meta is not None else None
+    allocator = allocators.get(key)
+    if allocator is None:
+        allocator = allocators[key] = ChannelAllocator.from_sequences(get_container(sequence))
+    return allocator
+
+
+def new_text_strip_from(parent, name, channel, frame_start, frame_end, sequences=None):
+    """Create a new text strip with the same style as parent
+
+    This uses the data API rather than bpy.ops.sequencer.duplicate(), so
+    it does not go through operator dispatch or change the selection.
+    By default the strip is created next to parent (in the same meta
+    strip, if it is in one)
+    """
+    if sequences is None:
+        sequences = get_container(parent)
+    strip = sequences.new_effect(name=name, type='TEXT', channel=channel,
+                                 frame_start=frame_start, frame_end=frame_end)
+    if profiler.enabled:
+        profiler.count("strips created")
+    for attr in TEXT_STYLE_ATTRIBUTES:
+        if hasattr(parent, attr):
+            setattr(strip, attr, getattr(parent, attr))
+    return strip
+
+
+def iter_split_text_strip(sequence, prop_group, rez_x, allocator=None):
+    """Split sequence into appearing words, yielding each created strip
+
+    Depending on prop_group.output_mode, that is one strip per word or one
+    per reveal step. sequence is muted once the last strip is created; a strip with
+    fewer than two words is left alone. This does not use (or change)
+    the selection, so can be used for any text strip.
+
+    Strips are created next to sequence (in the same meta strip, if it is
+    in one) and packed into the lowest free channels above it; pass a
+    ChannelAllocator for those sequences to share one between several splits
+    """
+    ts_words = sequence.text.split(" ")
+    if len(ts_words) <= 1:
+        return
+
+    # Work out all times and positions up front; the loop below then only
+    # has to write them to the new strips
+    word_widths = [get_strip_text_size(sequence, text=word)[0] for word in ts_words]
+    frame_starts, location_xs, location_ys = layout_strip_words(sequence, ts_words, word_widths,
+                                                                prop_group, rez_x)
+
+    sequences = get_container(sequence)
+    if allocator is None:
+        allocator = ChannelAllocator.from_sequences(sequences)
+
+    if prop_group.output_mode == "Cumulative":
+        # the text is all in one strip, so let Blender wrap it
+        wrap_width = (get_line_width(sequence, prop_group, rez_x) / rez_x
+                      if prop_group.line_break != "NONE" else None)
+        new_strips = iter_cumulative_reveal(sequence, ts_words, frame_starts, allocator,
+                                            sequences, wrap_width)
+    else:
+        record_split_style(sequence, prop_group)
+        new_strips = iter_word_strips(sequence, ts_words, word_widths, frame_starts,
+                                      location_xs, location_ys, allocator, sequences)
+
+    created = []
+    try:
+        for strip in new_strips:
+            created.append(strip)
+            yield strip
+    except ValueError:
+        # eg out of channels; don't leave a half-split sentence behind
+        for strip in created:
+            allocator.release(strip.channel, strip.frame_final_start, strip.frame_final_end)
+            sequences.remove(strip)
+        raise
+
+    sequence.mute = True
+    text_strip_index.invalidate(sequence.id_data)
+
+
+def get_line_width(sequence, prop_group, rez_x) -> float:
+    """How wide (in px) a line of text starting at sequence's location can be"""
+    return (1.0 - prop_group.line_margin - sequence.location[0]) * rez_x
+
+
+def layout_strip_words(sequence, ts_words, word_widths, prop_group, rez_x):
+    """layout_appearing_words (and break_lines) for the words of text strip sequence
+
+    This uses prop_group's options, and returns NumPy arrays of the start
+    frame, x location and y location of each word
+    """
+    space_width = get_strip_text_size(sequence, text=" ")[0]
+    line_numbers = break_lines(word_widths, space_width * (1.0 + prop_group.extra_word_spacing),
+                               get_line_width(sequence, prop_group, rez_x),
+                               prop_group.line_break)
+    word_starts = None
+    if prop_group.temporal_offset_type == "WordTimings":
+        word_starts = get_word_timing_frames(sequence, ts_words, prop_group.word_timings_path)
+    frame_starts, location_xs = layout_appearing_words(
+        word_lengths=[len(word) for word in ts_words],
+        word_widths=word_widths,
+        space_width=space_width,
+        parent_duration=sequence.frame_final_duration,
+        offset_type=prop_group.temporal_offset_type,
+        frame_offset=prop_group.frame_offset,
+        extra_word_spacing=prop_group.extra_word_spacing,
+        frame_start=sequence.frame_final_start,
+        location_x=sequence.location[0],
+        rez_x=rez_x,
+        line_numbers=line_numbers,
+        word_starts=word_starts,
+    )
+    # lines go down the frame; "Ag" has both an ascender and a descender
+    line_height = get_strip_text_size(sequence, text="Ag")[1] * prop_group.line_spacing
+    location_ys = sequence.location[1] - line_numbers * (line_height /
+                                                         sequence.id_data.render.resolution_y)
+    return frame_starts, location_xs, location_ys
+
+
+def record_split_style(sequence, prop_group):
+    """Remember (as custom properties) what sequence's words were laid out with"""
+    sequence["qte_font"] = sequence.font.filepath if sequence.font else ""
+    sequence["qte_font_size"] = sequence.font_size
+    sequence["qte_word_spacing"] = prop_group.extra_word_spacing
+    sequence["qte_location_x"] = sequence.location[0]
+    sequence["qte_location_y"] = sequence.location[1]
+    sequence["qte_line_break"] = prop_group.line_break
+    sequence["qte_line_margin"] = prop_group.line_margin
+    sequence["qte_line_spacing"] = prop_group.line_spacing
+    sequence["qte_offset_type"] = prop_group.temporal_offset_type
+    sequence["qte_frame_offset"] = prop_group.frame_offset
+    sequence["qte_frame_start"] = sequence.frame_final_start
+    sequence["qte_frame_end"] = sequence.frame_final_end
+
+
+def set_word_provenance(strip, parent, word_index, width):
+    """Record (as custom properties) which word of parent strip shows, and its width in px"""
+    strip["qte_parent"] = parent.name
+    strip["qte_word_index"] = word_index
+    strip["qte_width"] = width
+
+
+def iter_word_strips(sequence, ts_words, word_widths, frame_starts, location_xs, location_ys,
+                     allocator, sequences):
+    """Create one strip per word, each lasting until the end of the sentence"""
+    frame_end = int(sequence.frame_final_end)
+    for i, word in enumerate(ts_words):
+        frame_start = int(frame_starts[i])
+        channel = allocator.allocate(frame_start, frame_end, min_channel=sequence.channel+1)
+        # Give new strip the same style as the parent
+        new_strip = new_text_strip_from(sequence, f"split_word_{i}",
+                                        channel=channel,
+                                        frame_start=frame_start,
+                                        frame_end=frame_end,
+                                        sequences=sequences)
+        new_strip.location = (float(location_xs[i]), float(location_ys[i]))
+        new_strip.text = word
+        set_word_provenance(new_strip, sequence, i, word_widths[i])
+        yield new_strip
+
+
+def iter_cumulative_reveal(sequence, ts_words, frame_starts, allocator, sequences,
+                           wrap_width=None):
+    """Create one strip per reveal step, with the text so far ("The", "The quick", ...)
+
+    Each step lasts until the next word appears, so at any frame only one
+    strip is showing. Steps made zero frames long by clamping are skipped.
+    If wrap_width is given, the strips wrap their text at it
+    """
+    frame_end = int(sequence.frame_final_end)
+    step_ends = [int(frame) for frame in frame_starts[1:]] + [frame_end]
+    for i, (frame_start, step_end) in enumerate(zip(frame_starts, step_ends)):
+        frame_start = int(frame_start)
+        if step_end <= frame_start:
+            continue
+        channel = allocator.allocate(frame_start, step_end, min_channel=sequence.channel+1)
+        new_strip = new_text_strip_from(sequence, f"split_reveal_{i}",
+                                        channel=channel,
+                                        frame_start=frame_start,
+                                        frame_end=step_end,
+                                        sequences=sequences)
+        new_strip.text = " ".join(ts_words[:i+1])
+        if wrap_width is not None:
+            new_strip.wrap_width = wrap_width
+        # no qte_word_index, so find_split_words doesn't take this for a word
+        new_strip["qte_parent"] = sequence.name
+        new_strip["qte_reveal_index"] = i
+        yield new_strip
+
+
+def wrap_in_meta(parent, strips, include_parent=False, allocator=None):
+    """Move strips created from parent (and optionally parent) into a new meta strip
+
+    The meta strip goes in the lowest free channel above parent (or in
+    parent's channel, if parent is moved in too), next to parent. Strips
+    keep their frames, channels and locations inside it. Returns the meta strip
+    """
+    sequences = get_container(parent)
+    if allocator is None:
+        allocator = ChannelAllocator.from_sequences(sequences)
+
+    moving = list(strips) + ([parent] if include_parent else [])
+    for strip in moving:
+        allocator.release(strip.channel, strip.frame_final_start, strip.frame_final_end)
+    start = min(strip.frame_final_start for strip in moving)
+    end = max(strip.frame_final_end for strip in moving)
+    channel = allocator.allocate(start, end,
+                                 min_channel=parent.channel + (0 if include_parent else 1))
+
+    meta = sequences.new_meta(name=f"{parent.name}_words", channel=channel, frame_start=start)
+    for strip in moving:
+        strip.move_to_meta(meta)
+    text_strip_index.invalidate(parent.id_data)
+    return meta
+
+
+def split_text_strip(sequence, prop_group, rez_x, allocator=None):
+    """Split sequence into one text strip per word, and mute sequence
+
+    Returns a list of the created strips (see iter_split_text_strip); with
+    prop_group.use_meta these are then wrapped in a meta strip
+    """
+    strips = list(iter_split_text_strip(sequence, prop_group, rez_x, allocator))
+    if strips and prop_group.use_meta:
+        wrap_in_meta(sequence, strips, prop_group.meta_include_parent, allocator)
+    return strips
+
+
+def iter_sequences_with_container(sequences):
+    """Generate (strip, the sequences it is in) for sequences and, recursively, any meta strips"""
+    for strip in sequences:
+        yield strip, sequences
+        if strip.type == 'META':
+            yield from iter_sequences_with_container(strip.sequences)
+
+
+def find_split_words(editor):
+    """Map the name of each split text strip to {word index: (word strip, its sequences)}
+
+    This uses the custom properties set when splitting in "Words" mode, so
+    finds word strips wherever they are, including in meta strips
+    """
+    split_words = {}
+    for strip, container in iter_sequences_with_container(editor.sequences):
+        parent_name = strip.get("qte_parent")
+        if parent_name is not None and "qte_word_index" in strip:
+            split_words.setdefault(parent_name, {})[strip["qte_word_index"]] = (strip, container)
+    return split_words
+
+
+def relayout_split_text_strip(sequence, words, prop_group, rez_x):
+    """Bring the word strips of an already split text strip up to date with it
+
+    words maps word index to (word strip, the sequences it is in), as from
+    find_split_words. Only words from the first whose text changed get new
+    text, and only words from the first which moved get a new location, so
+    edits to earlier words are kept. Every word is retimed unless words
+    appear at the same fixed offset as before and the split strip hasn't
+    been moved or trimmed, as other timings depend on the whole sentence
+    (its word count, average word length or word timings); every word
+    ends with the split strip, though. Word widths are
+    only measured for changed words unless the font or its size changed. Extra
+    words get new strips (next to the last word, so in the same meta strip
+    if it is in one) and strips for words no longer in the text are removed.
+
+    Returns (updated, created, removed) strip counts
+    """
+    ts_words = sequence.text.split(" ")
+    old_words = [words[i][0].text if i in words else None for i in range(len(ts_words))]
+
+    font = sequence.font.filepath if sequence.font else ""
+    restyled = (sequence.get("qte_font") != font
+                or sequence.get("qte_font_size") != sequence.font_size)
+    first_changed = next((i for i, word in enumerate(ts_words) if old_words[i] != word),
+                         len(ts_words))
+    # widths before the first changed word are still right (if the style is)
+    first_measured = 0 if restyled else first_changed
+    # a word's position only depends on the words before it, unless the
+    # line breaks are balanced, which takes every word into account
+    first_moved = first_changed
+    relined = any(sequence.get(f"qte_{name}") != getattr(prop_group, name)
+                  for name in ("line_break", "line_margin", "line_spacing"))
+    if (restyled or relined or prop_group.line_break == "OPTIMAL"
+            or sequence.get("qte_location_x") != sequence.location[0]
+            or sequence.get("qte_location_y") != sequence.location[1]):
+        first_moved = 0
+    elif sequence.get("qte_word_spacing") != prop_group.extra_word_spacing:
+        first_moved = min(first_moved, 1)
+    # with a fixed offset a word's start only depends on its index (and the
+    # offset and the split strip's frames, if those are unchanged)
+    first_retimed = first_changed
+    if (prop_group.temporal_offset_type != "Fixed"
+            or sequence.get("qte_offset_type") != prop_group.temporal_offset_type
+            or sequence.get("qte_frame_offset") != prop_group.frame_offset
+            or sequence.get("qte_frame_start") != sequence.frame_final_start
+            or sequence.get("qte_frame_end") != sequence.frame_final_end):
+        first_retimed = 0
+
+    word_widths = [words[i][0]["qte_width"] if i < first_measured
+                   else get_strip_text_size(sequence, text=word)[0]
+                   for i, word in enumerate(ts_words)]
+    frame_starts, location_xs, location_ys = layout_strip_words(sequence, ts_words, word_widths,
+                                                                prop_group, rez_x)
+    frame_end = int(sequence.frame_final_end)
+
+    updated = created = removed = 0
+    allocators = {}
+    last_container = get_container(sequence)
+    for i, word in enumerate(ts_words):
+        if i not in words:
+            container = last_container
+            if id(container) not in allocators:
+                allocators[id(container)] = ChannelAllocator.from_sequences(container)
+            allocator = allocators[id(container)]
+            channel = allocator.allocate(int(frame_starts[i]), frame_end,
+                                         min_channel=sequence.channel+1)
+            strip = new_text_strip_from(sequence, f"split_word_{i}", channel=channel,
+                                        frame_start=int(frame_starts[i]),
+                                        frame_end=frame_end, sequences=container)
+            strip.location = (float(location_xs[i]), float(location_ys[i]))
+            strip.text = word
+            set_word_provenance(strip, sequence, i, word_widths[i])
+            created += 1
+            continue
+
+        strip, last_container = words[i]
+        if i < first_moved and i < first_retimed and strip.frame_final_end == frame_end:
+            continue
+        if restyled:
+            strip.font = sequence.font
+            strip.font_size = sequence.font_size
+        if i >= first_changed:
+            strip.text = word
+        if i >= first_retimed and strip.frame_final_start != frame_starts[i]:
+            if frame_starts[i] >= strip.frame_final_end:
+                # moving past its old end, which has to go first
+                strip.frame_final_end = frame_end
+            strip.frame_final_start = int(frame_starts[i])
+        if strip.frame_final_end != frame_end:
+            strip.frame_final_end = frame_end
+        if i >= first_moved:
+            strip.location = (float(location_xs[i]), float(location_ys[i]))
+        if i >= first_measured:
+            strip["qte_width"] = word_widths[i]
+        updated += 1
+
+    for i, (strip, container) in words.items():
+        if i >= len(ts_words):
+            container.remove(strip)
+            removed += 1
+
+    record_split_style(sequence, prop_group)
+    text_strip_index.invalidate(sequence.id_data)
+    return updated, created, removed
+
+
+# Which text strips split_to_appearing_words works on
+aw_split_scope_options = [
+    ("SELECTED", "Selected", "Split every selected text strip"),
+    ("CHANNEL", "Channel", "Split every (unmuted) text strip in a channel"),
+    ("RANGE", "Frame Range", "Split every (unmuted) text strip overlapping a frame range"),
+]
+
+
+class AppearingWordsAction(TextSequenceAction):
+    """Options and checks shared by the split to appearing words operators
+    (shouldn't be used directly)"""
+
+    scope: bpy.props.EnumProperty(
+        name="Strips",
+        description="Which text strips to split",
+        items=aw_split_scope_options,
+        default="SELECTED",
+    )
+
+    channel: bpy.props.IntProperty(
+        name="Channel",
+        description="Channel to split text strips in",
+        default=1,
+        min=1,
+        max=MAX_CHANNEL,
+    )
+
+    frame_start: bpy.props.IntProperty(
+        name="Start Frame",
+        description="Split text strips overlapping this frame or later",
+        default=1,
+    )
+
+    frame_end: bpy.props.IntProperty(
+        name="End Frame",
+        description="Split text strips overlapping this frame or earlier",
+        default=250,
+    )
 
     @classmethod
     def poll(cls, context):
@@ -596,117 +2466,260 @@ class SEQUENCER_OT_split_to_appearing_words(TextSequenceAction):
         return (context.scene and context.scene.sequence_editor
                 and context.selected_editable_sequences is not None)
 
-    def execute(self, context):
-        """Do the actual creation of new strips"""
+    def get_target_strips(self, context):
+        """Get the text strips to split, according to scope"""
+        if self.scope == "SELECTED":
+            return [strip for strip in context.selected_editable_sequences
+                    if strip.type == 'TEXT']
+
+        if self.scope == "CHANNEL":
+            strips = text_strip_index.in_channel(context.scene, self.channel)
+        else:
+            strips = text_strip_index.in_range(context.scene, self.frame_start, self.frame_end + 1)
+        return [strip for strip in strips if not strip.mute]
+
+    def prepare(self, context):
+        """Get the text strips to split, or None (having reported why) if there aren't any"""
+        prop_group = context.window_manager.appearing_text_options
+
+        # sanity check: text sequences with > 1 word, which weren't made by splitting
+        # (cumulative reveal steps have several words)
+        sequences = [strip for strip in self.get_target_strips(context)
+                     if len(strip.text.split(" ")) > 1 and "qte_parent" not in strip]
+        if not sequences:
+            self.report({"ERROR"}, "This requires a text sequence with more than one word to split on")
+            return None
 
-        def get_strip_text_size(strip, text=None):
-            """get the size of supplied text based on strip font in px"""
-            def get_fontid_from_path(filepath=None) -> int:
-                """given a filepath, use blf to get a fontid -- does not perform sanity checking!
-                """
-                # this is a horrible workaround, see
-                # https://devtalk.blender.org/t/getting-a-font-from-fontid-or-fontid-from-vectorfont-textsequence/28183/2
-                # for more info
-                return blf.load(path.normpath(bpy.path.abspath(filepath)))
+        if prop_group.temporal_offset_type == "WordTimings" and not prop_group.word_timings_path:
+            self.report({"ERROR"}, "Choose a word timings file first")
+            return None
 
-            fontid = get_fontid_from_path(filepath=strip.font.filepath)
-            blf.size(fontid, strip.font_size)
-            return blf.dimensions(fontid, text)
+        # Pre-start sanity check: if somehow the frame_offset is < 0 (eg it is still at
+        # its default of -1), set it to 1
+        if prop_group.frame_offset < 0:
+            prop_group.frame_offset = 1
+
+        return sequences
+
+
+class SEQUENCER_OT_split_to_appearing_words(AppearingWordsAction):
+    """Split the text in a text sequence to several text sequences
+
+    The words should appear one after another in both time and space"""
+
+    bl_label = "Convert to appearing words"
+    bl_idname = "sequencer.split_to_appearing_words"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @profiled
+    def execute(self, context):
+        """Do the actual creation of new strips"""
 
         prop_group = context.window_manager.appearing_text_options
         scene = context.scene
         rez_x = scene.render.resolution_x
+        time_start = time.perf_counter()
 
-        # sanity check (FUTURE: see if there's a way to work on multiple in a sensible way)
-        if len(context.selected_editable_sequences) != 1:
-            self.report({"ERROR"}, "This only works on one text sequence at a time")
+        sequences = self.prepare(context)
+        if sequences is None:
             return {"CANCELLED"}
 
-        sequence = context.selected_editable_sequences[0]
+        # main body of work; everything happens within this operator, so
+        # it is a single undo step however many strips are split
+        # one allocator per meta strip (or the top level) split strips are in
+        allocators = {}
+        created_count = 0
+        for sequence in sequences:
+            try:
+                allocator = get_container_allocator(sequence, allocators)
+                created_count += len(split_text_strip(sequence, prop_group, rez_x, allocator))
+            except ValueError as err:
+                self.report({"WARNING"}, f"Stopped splitting at {sequence.name}: {err}")
+                break
+
+        if len(sequences) == 1:
+            sequence = sequences[0]
+            context.scene.frame_current = int(sequence.frame_start + sequence.frame_final_duration - 1)
+
+        self.report({"INFO"}, f"Created {created_count} strips from {len(sequences)} "
+                    f"text strips in {time.perf_counter() - time_start:.3f}s")
 
-        # next sanity check: text sequence with > 1 word
-        if sequence.type != 'TEXT':
-            self.report({"ERROR"}, "This should only be availabe on text sequences!")
-            return {"CANCELLED"}
+        return {'FINISHED'}
 
-        if len(sequence.text.split(" ")) <= 1:
-            self.report({"ERROR"}, "This requires more than one word to split on")
-            return {"CANCELLED"}
 
-        # main body of work
-        previous_strip = None
-        ts_words = sequence.text.split(" ")
-        ts_letters_count = sum(map(len, ts_words))
-        average_word_length = ts_letters_count / len(ts_words)
+class SEQUENCER_OT_split_to_appearing_words_modal(AppearingWordsAction):
+    """Split text sequences to appearing words a little at a time, keeping Blender responsive
 
-        # Pre-start sanity check: if somehow the frame_offset is < 0 (eg it is still at
-        # its default of -1), set it to 1
-        if prop_group.frame_offset < 0:
-            prop_group.frame_offset = 1
+    Esc cancels, removing every strip created so far"""
 
-        for i, word in enumerate(ts_words):
-            # Give new strip the same properties as the old one
-            # Assumption: duplicate() changes selection to newly-created strip
-            # so we can use that selection to reference the new strip
-            bpy.ops.sequencer.duplicate()
-            new_strip = context.selected_editable_sequences[0]
-            new_strip.name = f"split_word_{i}"
-
-            # Set times for new strip
-            # NB since strip is duplicated, no need to set first strip's (i==0) start_frame
-            # TODO: minimum length
-            if i > 0:
-                if prop_group.temporal_offset_type == "Fixed":
-                    # All fixed offset
-                    offset = prop_group.frame_offset
-                if prop_group.temporal_offset_type == "RelativeLength":
-                    # relative to the 'fixed offset', some will be shorter and some will be longer
-                    # based on the length of word compared to average
-                    offset = prop_group.frame_offset * \
-                        (len(previous_strip.text) / average_word_length)
-                elif prop_group.temporal_offset_type == "ParentEqual":
-                    # All the same but based on parent duration
-                    offset = int(sequence.frame_final_duration / len(ts_words))
-                elif prop_group.temporal_offset_type == "ParentRelativeLength":
-                    # Relative to parent duration but modified by previous word length
-                    # eg 'of' (short) 'farce' (medium) 'narrativism' (long)
-                    # use average from 'ParentEqual' multipled by wordlength/averagelength
-                    offset = int(sequence.frame_final_duration / len(ts_words)) * \
-                        (len(previous_strip.text) / average_word_length)
-                new_strip.frame_start = int(previous_strip.frame_start + offset)
-            new_strip.frame_final_end = int(sequence.frame_final_end)
-            new_strip.channel = (sequence.channel+1+i)
-
-            # Set position for new strip
-            # For the first strip (i=0), set location to 'parent' strip. For subsequent
-            # strips, use the position of the previous strip plus the length of the word
-            # plus an inter-word offset.
-            #
-            # Start from parent strip's location and alignment
-            #
-            # stretch goal: line splitting
-            if i == 0:
-                new_strip.location[0] = sequence.location[0]
+    bl_label = "Convert to appearing words (background)"
+    bl_idname = "sequencer.split_to_appearing_words_modal"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    budget_ms: bpy.props.FloatProperty(
+        name="Time per step (ms)",
+        description="How long to spend creating strips between UI updates",
+        default=8.0,
+        min=1.0,
+        soft_max=50.0,
+    )
+
+    def execute(self, context):
+        """Without invoke (eg from a script or redo) there's no UI to keep responsive"""
+        return SEQUENCER_OT_split_to_appearing_words.execute(self, context)
+
+    def iter_work(self, sequences, prop_group, rez_x):
+        """Split each of sequences in turn, yielding each created strip"""
+        for sequence in sequences:
+            names = []
+            allocator = get_container_allocator(sequence, self._allocators)
+            for strip in iter_split_text_strip(sequence, prop_group, rez_x, allocator):
+                names.append(strip.name)
+                yield strip
+            self._split_parents.append(sequence.name)
+            self._split_strips.append(names)
+
+    def invoke(self, context, event):
+        sequences = self.prepare(context)
+        if sequences is None:
+            return {"CANCELLED"}
+
+        scene = context.scene
+        # Strips are remembered by name, since references don't survive undo
+        self._created = []
+        self._split_parents = []
+        self._split_strips = []
+        self._total = sum(len(sequence.text.split(" ")) for sequence in sequences)
+        self._time_start = time.perf_counter()
+        self._allocators = {}
+        self._work = self.iter_work(
+            sequences, context.window_manager.appearing_text_options,
+            scene.render.resolution_x)
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, self._total)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.rollback(context)
+            self.finish(context)
+            self.report({"INFO"}, "Cancelled splitting to appearing words")
+            return {'CANCELLED'}
+        if event.type in {'Z', 'Y'} and (event.ctrl or event.oskey):
+            # undo would free the strips the split is still working on
+            return {'RUNNING_MODAL'}
+        if event.type != 'TIMER' or event.timer is not self._timer:
+            return {'PASS_THROUGH'}
+
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        try:
+            for strip in self._work:
+                self._created.append(strip.name)
+                if time.perf_counter() >= deadline:
+                    break
             else:
-                # New location is previous strip location
-                #  + previous strip width
-                #  + width of space
-                #  + extra spacing specified by user
-                new_strip.location[0] = previous_strip.location[0] + \
-                    (get_strip_text_size(sequence, text=previous_strip.text)[0] / rez_x) + \
-                    (get_strip_text_size(sequence, text=" ")[0] / rez_x) + \
-                    (prop_group.extra_word_spacing *
-                     get_strip_text_size(sequence, text=" ")[0]/rez_x)
+                return self.done(context)
+        except ValueError as err:
+            # the sentence being split has already been removed
+            sequences_all = context.scene.sequence_editor.sequences_all
+            self._created = [name for name in self._created if sequences_all.get(name)]
+            self.report({"WARNING"}, f"Stopped splitting: {err}")
+            return self.done(context)
+        except Exception as err:
+            # eg ReferenceError when undo from a menu freed a strip being split;
+            # the timer must still be removed, whatever went wrong
+            self.rollback(context)
+            self.finish(context)
+            self.report({"ERROR"}, f"Cancelled splitting to appearing words: {err}")
+            return {'CANCELLED'}
+
+        context.window_manager.progress_update(len(self._created))
+        context.workspace.status_text_set(
+            f"Splitting to appearing words: {len(self._created)}/{self._total} "
+            "(Esc to cancel)")
+        return {'RUNNING_MODAL'}
+
+    def done(self, context):
+        # Wrapping is left until everything is split, so Esc never has to
+        # take strips back out of a meta strip
+        prop_group = context.window_manager.appearing_text_options
+        if prop_group.use_meta:
+            sequences_all = context.scene.sequence_editor.sequences_all
+            for parent_name, names in zip(self._split_parents, self._split_strips):
+                parent = sequences_all.get(parent_name)
+                strips = [strip for strip in map(sequences_all.get, names) if strip is not None]
+                if parent is not None and strips:
+                    wrap_in_meta(parent, strips, prop_group.meta_include_parent,
+                                 get_container_allocator(parent, self._allocators))
+        self.finish(context)
+        self.report({"INFO"}, f"Created {len(self._created)} strips from "
+                    f"{len(self._split_parents)} text strips in "
+                    f"{time.perf_counter() - self._time_start:.3f}s")
+        return {'FINISHED'}
 
-            new_strip.text = word
+    def rollback(self, context):
+        """Remove everything created so far, and unmute the strips split so far"""
+        self._work.close()
+        editor = context.scene.sequence_editor
+        if editor is None:
+            return
+        for name in self._created:
+            strip = editor.sequences_all.get(name)
+            if strip is not None:
+                get_container(strip).remove(strip)
+        for name in self._split_parents:
+            strip = editor.sequences_all.get(name)
+            if strip is not None:
+                strip.mute = False
+        text_strip_index.invalidate(context.scene)
+
+    def finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
 
-            # feels smelly, but keep a reference for the next loop for location
-            previous_strip = new_strip
 
-        sequence.mute = True
+class SEQUENCER_OT_relayout_appearing_words(TextSequenceAction):
+    """Update the word strips of split text strips after their text, font size or
+    word spacing has changed, keeping any edits to words which haven't moved"""
+
+    bl_label = "Update appearing words"
+    bl_idname = "sequencer.relayout_appearing_words"
+    bl_options = {'REGISTER', 'UNDO'}
 
-        context.scene.frame_current = int(sequence.frame_start + sequence.frame_final_duration - 1)
+    @profiled
+    def execute(self, context):
+        prop_group = context.window_manager.appearing_text_options
+        scene = context.scene
+        editor = scene.sequence_editor
+        split_words = find_split_words(editor)
+
+        # either the split strip or any of its words can be selected
+        parent_names = []
+        for strip in context.selected_editable_sequences:
+            name = strip.name if strip.name in split_words else strip.get("qte_parent")
+            if name in split_words and name not in parent_names:
+                parent_names.append(name)
+        parent_names = [name for name in parent_names if editor.sequences_all.get(name)]
+        if not parent_names:
+            self.report({"ERROR"}, "Select a text strip split into words (or one of its words)")
+            return {"CANCELLED"}
 
+        totals = [0, 0, 0]
+        for name in parent_names:
+            try:
+                counts = relayout_split_text_strip(editor.sequences_all[name], split_words[name],
+                                                   prop_group, scene.render.resolution_x)
+            except ValueError as err:
+                self.report({"WARNING"}, f"Stopped updating at {name}: {err}")
+                break
+            totals = [total + count for total, count in zip(totals, counts)]
+
+        self.report({"INFO"}, "Updated {}, created {} and removed {} word strips".format(*totals))
         return {'FINISHED'}
 
 
@@ -733,7 +2746,9 @@ class SEQUENCER_PT_appearing_text(bpy.types.Panel):
         #     layout.label(text=line)
         layout.separator()
 
-        if prop_group.temporal_offset_type not in ("ParentEqual", "ParentRelativeLength"):
+        if prop_group.temporal_offset_type == "WordTimings":
+            layout.prop(prop_group, "word_timings_path", text="")
+        elif prop_group.temporal_offset_type not in ("ParentEqual", "ParentRelativeLength"):
             layout.prop(prop_group, "time_offset")
             # find out if better way to set a default that depends on
             # FPS (ie cannot be set in definition)
@@ -743,10 +2758,37 @@ class SEQUENCER_PT_appearing_text(bpy.types.Panel):
                                                     bpy.context.scene.render.fps_base)
                                               )
             layout.prop(prop_group, "frame_offset")
-        layout.prop(prop_group, "extra_word_spacing", slider=True)
+        layout.prop(prop_group, "output_mode")
+        if prop_group.output_mode == "Words":
+            layout.prop(prop_group, "extra_word_spacing", slider=True)
+        layout.prop(prop_group, "line_break")
+        if prop_group.line_break != "NONE":
+            layout.prop(prop_group, "line_margin", slider=True)
+            if prop_group.output_mode == "Words":
+                layout.prop(prop_group, "line_spacing")
+        layout.prop(prop_group, "use_meta")
+        if prop_group.use_meta:
+            layout.prop(prop_group, "meta_include_parent")
         layout.separator(factor=2.0)
         box = layout.box()
         box.operator("sequencer.split_to_appearing_words", icon='OUTLINER')
+        box.operator("sequencer.split_to_appearing_words_modal", icon='TIME')
+        box.operator("sequencer.relayout_appearing_words", icon='FILE_REFRESH')
+
+
+class SEQUENCER_PT_qte_presets(bpy.types.Panel):
+    """Panel for applying presets across the timeline"""
+    bl_label = "Presets"
+    bl_space_type = "SEQUENCE_EDITOR"
+    bl_region_type = "UI"
+    bl_category = "QTE"
+
+    def draw(self, context):
+        """Draw the presets panel"""
+        layout = self.layout
+        layout.operator("sequencer.apply_preset_to_matching", icon='PRESET')
+        layout.operator("sequencer.fit_text_to_frame", icon='FULLSCREEN_ENTER')
+        layout.operator("sequencer.check_text_collisions", icon='ERROR')
 
 
 def appearing_text_panel_layout(self, context):
@@ -755,13 +2797,594 @@ def appearing_text_panel_layout(self, context):
     self.layout.operator("sequencer.split_to_appearing_words")
 
 
+# BEGIN subtitle import/export
+
+
+# 00:01:02,500 --> 00:01:04,000 (SRT) or [00:]01:02.500 --> 01:04.000 (WebVTT),
+# WebVTT timing lines may be followed by cue settings
+SUBTITLE_TIMING_RE = re.compile(
+    r"((?:\d+:)?\d{1,2}:\d{2}[,.]\d{1,3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[,.]\d{1,3})")
+# Inline markup: <i>, <b>, <c.classname>, <v Speaker>, <00:00:01.000> etc
+SUBTITLE_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def get_fps(scene) -> float:
+    """Frames per second for scene"""
+    return float(scene.render.fps / scene.render.fps_base)
+
+
+def parse_timestamp(timestamp) -> float:
+    """Convert an SRT or WebVTT timestamp to seconds"""
+    seconds = 0.0
+    for part in timestamp.replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def iter_subtitle_cues(lines):
+    """Generate (start, end, text) cues from the lines of an SRT or WebVTT file
+
+    Times are in seconds; cue text has its lines joined with spaces and any
+    inline markup removed. This works a line at a time, so memory use does
+    not depend on the length of the file. Cue numbers/identifiers, the
+    WEBVTT header and NOTE/STYLE/REGION blocks are skipped since they
+    aren't followed by a timing line
+    """
+    start = end = None
+    text = []
+    for line in lines:
+        line = line.strip()
+        timing = SUBTITLE_TIMING_RE.search(line)
+        if timing:
+            # be lenient about a missing blank line between cues
+            if start is not None and text:
+                yield start, end, " ".join(text)
+            start, end = parse_timestamp(timing.group(1)), parse_timestamp(timing.group(2))
+            text = []
+        elif not line:
+            if start is not None and text:
+                yield start, end, " ".join(text)
+            start = end = None
+            text = []
+        elif start is not None:
+            line = html.unescape(SUBTITLE_TAG_RE.sub("", line)).strip()
+            if line:
+                text.append(line)
+    if start is not None and text:
+        yield start, end, " ".join(text)
+
+
+def import_subtitles(scene, filepath, channel=1, presets=(), duration_preset=None):
+    """Create a text strip for each cue in an SRT or WebVTT file
+
+    presets is a sequence of (operator class, preset properties) pairs
+    applied as each strip is created, eg (SetTextColour, kmi.properties),
+    bar those with a transition, which are animated on all the new strips
+    at once. A duration preset is used to work out the strip's length
+    before it is created. Strips go in the lowest free channel from channel upwards.
+    Returns the number of strips created
+    """
+    if scene.sequence_editor is None:
+        scene.sequence_editor_create()
+    sequences = scene.sequence_editor.sequences
+    allocator = ChannelAllocator.from_sequences(sequences)
+    fps = get_fps(scene)
+
+    # transitions are keyed for all the strips in one go (see animate_strips)
+    animated = [(operator, preset) for operator, preset in presets
+                if getattr(preset, "transition_frames", 0) > 0]
+    immediate = [(operator, preset) for operator, preset in presets
+                 if getattr(preset, "transition_frames", 0) <= 0]
+
+    strips = []
+    with open(filepath, encoding="utf-8-sig", errors="replace") as subtitle_file:
+        for start, end, text in iter_subtitle_cues(subtitle_file):
+            frame_start = scene.frame_start + round(start * fps)
+            duration = max(round(end * fps) - round(start * fps), 1)
+            if duration_preset is not None:
+                duration = max(SetTextDuration.get_duration(duration, duration_preset), 1)
+            frame_end = frame_start + duration
+
+            strip = sequences.new_effect(
+                name=f"subtitle_{len(strips)}", type='TEXT',
+                channel=allocator.allocate(frame_start, frame_end, min_channel=channel),
+                frame_start=frame_start, frame_end=frame_end)
+            if profiler.enabled:
+                profiler.count("strips created")
+            strip.text = text
+            for operator, preset in immediate:
+                operator.apply(strip, preset)
+            strips.append(strip)
+
+    for operator, preset in animated:
+        operator.apply_all(strips, preset)
+
+    text_strip_index.invalidate(scene)
+    return len(strips)
+
+
+class SEQUENCER_OT_import_subtitles(bpy.types.Operator, ImportHelper):
+    """Import an SRT or WebVTT subtitle file as text strips"""
+    bl_idname = "sequencer.import_subtitles"
+    bl_label = "Import Subtitles"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filename_ext = ".srt"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.srt;*.vtt",
+        options={'HIDDEN'},
+    )
+
+    channel: bpy.props.IntProperty(
+        name="Channel",
+        description="Lowest channel to put subtitles in",
+        default=1,
+        min=1,
+        max=MAX_CHANNEL,
+    )
+
+    colour_preset: bpy.props.EnumProperty(
+        name="Colour",
+        description="Colour preset to apply to imported subtitles",
+        items=lambda self, context: preset_enum_items(context, SetTextColour.bl_idname),
+    )
+
+    location_preset: bpy.props.EnumProperty(
+        name="Location",
+        description="Location preset to apply to imported subtitles",
+        items=lambda self, context: preset_enum_items(context, SetTextLocation.bl_idname),
+    )
+
+    size_preset: bpy.props.EnumProperty(
+        name="Size",
+        description="Size preset to apply to imported subtitles",
+        items=lambda self, context: preset_enum_items(context, SetTextSize.bl_idname),
+    )
+
+    duration_preset: bpy.props.EnumProperty(
+        name="Duration",
+        description="Duration preset to apply to imported subtitles (instead of cue timing)",
+        items=lambda self, context: preset_enum_items(context, SetTextDuration.bl_idname),
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene is not None
+
+    def get_chosen_preset(self, context, operator, choice):
+        """Get preset properties for an enum choice, or None"""
+        if choice == "NONE":
+            return None
+        return get_preset(context, operator.bl_idname, int(choice))
+
+    @profiled
+    def execute(self, context):
+        time_start = time.perf_counter()
+        presets = []
+        for operator, choice in ((SetTextColour, self.colour_preset),
+                                 (SetTextLocation, self.location_preset),
+                                 (SetTextSize, self.size_preset)):
+            preset = self.get_chosen_preset(context, operator, choice)
+            if preset is not None:
+                presets.append((operator, preset))
+        duration_preset = self.get_chosen_preset(context, SetTextDuration,
+                                                 self.duration_preset)
+
+        try:
+            created = import_subtitles(context.scene, self.filepath, channel=self.channel,
+                                       presets=presets, duration_preset=duration_preset)
+        except (OSError, ValueError) as err:
+            self.report({"ERROR"}, f"Could not import {self.filepath}: {err}")
+            return {"CANCELLED"}
+
+        self.report({"INFO"}, f"Imported {created} subtitles in "
+                    f"{time.perf_counter() - time_start:.3f}s")
+        return {'FINISHED'}
+
+
+def import_subtitles_menu_entry(self, context):
+    """Add subtitle import to File > Import"""
+    self.layout.operator(SEQUENCER_OT_import_subtitles.bl_idname,
+                         text="Subtitles for VSE (.srt/.vtt)")
+
+
+def format_timestamp(seconds, separator=",") -> str:
+    """Format seconds as an SRT (or with separator='.', WebVTT) timestamp"""
+    millis = max(round(seconds * 1000), 0)
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+# split_word_3 or split_reveal_3, or split_word_3.001 if Blender had to make the name unique
+SPLIT_STRIP_NAME_RE = re.compile(r"^split_(word|reveal)_(\d+)")
+
+
+def iter_text_cues(sequences):
+    """Generate (frame_start, frame_end, text, words) for text strips in time order
+
+    Strips made by split_to_appearing_words are regrouped into their
+    (muted) parent's sentence, with words being a list of
+    (frame_start, frame_end, word) for each word; for any other strip
+    words is None. Other muted strips are skipped. The strips are sorted
+    once, and each split strip finds its parent through an interval tree
+    """
+    text_strips = sorted((strip for strip in sequences if strip.type == 'TEXT'),
+                         key=lambda strip: (strip.frame_final_start, strip.channel))
+
+    # split strips are within their parent, which is muted and in a lower channel
+    parent_tree = IntervalTree((strip.frame_final_start, strip.frame_final_end, strip)
+                               for strip in text_strips if strip.mute)
+
+    sentence_words = {}
+    grouped = set()
+    for strip in text_strips:
+        name_match = SPLIT_STRIP_NAME_RE.match(strip.name)
+        if strip.mute or not name_match:
+            continue
+        kind, word_index = name_match.group(1), int(name_match.group(2))
+        for parent in parent_tree.at(strip.frame_final_start):
+            parent_words = parent.text.split(" ")
+            if parent.channel >= strip.channel or word_index >= len(parent_words):
+                continue
+            if kind == "word":
+                matched = (parent_words[word_index] == strip.text
+                           and parent.frame_final_end == strip.frame_final_end)
+            else:
+                matched = " ".join(parent_words[:word_index+1]) == strip.text
+            if matched:
+                sentence_words.setdefault(parent.name, []).append(
+                    (word_index, strip.frame_final_start, parent_words[word_index]))
+                grouped.add(strip.name)
+                break
+
+    for strip in text_strips:
+        if strip.name in grouped or not strip.text:
+            continue
+        if not strip.mute:
+            yield strip.frame_final_start, strip.frame_final_end, strip.text, None
+        elif strip.name in sentence_words:
+            words = sorted(sentence_words[strip.name])
+            word_ends = [word_start for _, word_start, _ in words[1:]] + [strip.frame_final_end]
+            yield (strip.frame_final_start, strip.frame_final_end, strip.text,
+                   [(word_start, word_end, word)
+                    for (_, word_start, word), word_end in zip(words, word_ends)])
+
+
+def export_subtitles(scene, filepath, file_format="SRT", sequences=None):
+    """Write text strips (by default, all of scene's) as SRT, WebVTT or JSON
+
+    Cues are written as they are generated rather than built up in memory.
+    The JSON format is a list of cues, each with its words (if it was
+    split to appearing words). Returns the number of cues written
+    """
+    if sequences is None:
+        sequences = scene.sequence_editor.sequences_all
+    fps = get_fps(scene)
+
+    def to_seconds(frame):
+        return (frame - scene.frame_start) / fps
+
+    written = 0
+    with open(filepath, "w", encoding="utf-8") as subtitle_file:
+        if file_format == "VTT":
+            subtitle_file.write("WEBVTT\n\n")
+        elif file_format == "JSON":
+            subtitle_file.write("[")
+
+        for frame_start, frame_end, text, words in iter_text_cues(sequences):
+            written += 1
+            if file_format == "JSON":
+                cue = {"start": to_seconds(frame_start), "end": to_seconds(frame_end),
+                       "text": text}
+                if words is not None:
+                    cue["words"] = [{"start": to_seconds(word_start), "end": to_seconds(word_end),
+                                     "text": word}
+                                    for word_start, word_end, word in words]
+                subtitle_file.write(("\n" if written == 1 else ",\n") + json.dumps(cue))
+            else:
+                separator = "." if file_format == "VTT" else ","
+                subtitle_file.write(
+                    f"{written}\n"
+                    f"{format_timestamp(to_seconds(frame_start), separator)} --> "
+                    f"{format_timestamp(to_seconds(frame_end), separator)}\n"
+                    f"{text}\n\n")
+
+        if file_format == "JSON":
+            subtitle_file.write("\n]\n")
+
+    return written
+
+
+subtitle_export_format_options = [
+    ("SRT", "SubRip (.srt)", "One cue per text strip / split sentence"),
+    ("VTT", "WebVTT (.vtt)", "One cue per text strip / split sentence"),
+    ("JSON", "JSON (.json)", "Cues with word-level timing for split sentences"),
+]
+
+
+class SEQUENCER_OT_export_subtitles(bpy.types.Operator, ExportHelper):
+    """Export text strips as an SRT, WebVTT or JSON subtitle file"""
+    bl_idname = "sequencer.export_subtitles"
+    bl_label = "Export Subtitles"
+
+    filename_ext = ".srt"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.srt;*.vtt;*.json",
+        options={'HIDDEN'},
+    )
+
+    file_format: bpy.props.EnumProperty(
+        name="Format",
+        description="Subtitle file format",
+        items=subtitle_export_format_options,
+    )
+
+    selected_only: bpy.props.BoolProperty(
+        name="Selected Only",
+        description="Only export selected text strips",
+        default=False,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene is not None and context.scene.sequence_editor is not None
+
+    def check(self, context):
+        """Keep the file extension in line with the chosen format"""
+        filepath = bpy.path.ensure_ext(path.splitext(self.filepath)[0],
+                                       "." + self.file_format.lower())
+        changed = filepath != self.filepath
+        self.filepath = filepath
+        return changed
+
+    @profiled
+    def execute(self, context):
+        self.check(context)
+        time_start = time.perf_counter()
+        sequences = None
+        if self.selected_only:
+            # selected_sequences only has the top level, so add what's in selected meta strips
+            sequences = list({strip.name: strip for strip, _ in iter_sequences_with_container(
+                context.selected_sequences or [])}.values())
+        try:
+            written = export_subtitles(context.scene, self.filepath,
+                                       file_format=self.file_format, sequences=sequences)
+        except OSError as err:
+            self.report({"ERROR"}, f"Could not export {self.filepath}: {err}")
+            return {"CANCELLED"}
+
+        self.report({"INFO"}, f"Exported {written} subtitles in "
+                    f"{time.perf_counter() - time_start:.3f}s")
+        return {'FINISHED'}
+
+
+def export_subtitles_menu_entry(self, context):
+    """Add subtitle export to File > Export"""
+    self.layout.operator(SEQUENCER_OT_export_subtitles.bl_idname,
+                         text="Subtitles from VSE (.srt/.vtt/.json)")
+
+
+# END subtitle import/export
+
+# BEGIN word timings
+#
+# Word-level timestamps, eg from a forced aligner, for the "WordTimings"
+# temporal offset type. Times are in seconds from the scene's start frame
+
+# <00:00:01.250> karaoke-style timestamps within WebVTT cue text
+WORD_TIMESTAMP_RE = re.compile(r"<((?:\d+:)?\d{1,2}:\d{2}[,.]\d{1,3})>")
+# Word matching ignores case and anything but letters and digits
+WORD_IGNORED_RE = re.compile(r"[\W_]+")
+
+
+def normalise_word(word) -> str:
+    """Reduce word to what is compared when matching it to word timings"""
+    return WORD_IGNORED_RE.sub("", word).casefold()
+
+
+def iter_json_word_timings(data):
+    """Generate (start, word) from parsed JSON
+
+    Any object with a single-word "word" (or "text") and a numeric "start"
+    counts, however deeply it is nested, so this reads eg Gentle's
+    {"words": [...]}, WhisperX's {"segments": [{"words": [...]}]} and plain
+    lists of words. Words without a start (not found in the audio) are skipped
+    """
+    if isinstance(data, dict):
+        word = data.get("word", data.get("text"))
+        start = data.get("start", data.get("start_time"))
+        if (isinstance(word, str) and isinstance(start, (int, float))
+                and len(word.split()) == 1):
+            yield float(start), word.strip()
+            return
+        for value in data.values():
+            yield from iter_json_word_timings(value)
+    elif isinstance(data, list):
+        for item in data:
+            yield from iter_json_word_timings(item)
+
+
+def iter_csv_word_timings(lines, delimiter=","):
+    """Generate (start, word) from the lines of a CSV file
+
+    Columns are found from a header row (start/begin and word/text/label,
+    as in Montreal Forced Aligner's CSV output); without one, rows are
+    taken as start, end, word. Rows without a numeric start are skipped
+    """
+    columns = None
+    for row in csv.reader(lines, delimiter=delimiter):
+        if not row:
+            continue
+        if columns is None:
+            header = [cell.strip().casefold() for cell in row]
+            start_column = next((header.index(name) for name in
+                                 ("start", "start_time", "begin", "from") if name in header), None)
+            word_column = next((header.index(name) for name in
+                                ("word", "text", "token", "label") if name in header), None)
+            if start_column is not None and word_column is not None:
+                columns = start_column, word_column
+                continue
+            columns = 0, min(2, len(row) - 1)
+        try:
+            yield float(row[columns[0]]), row[columns[1]].strip()
+        except (ValueError, IndexError):
+            continue
+
+
+def iter_vtt_word_timings(lines):
+    """Generate (start, word) from the lines of a WebVTT (or SRT) file
+
+    Words take their start from the closest <00:00:01.250> timestamp before
+    them in the cue text; words without one (eg cues of several words with
+    no timestamps) are spread evenly up to the next timestamp or the end of
+    the cue. This works a line at a time, like iter_subtitle_cues
+    """
+    def cue_words(segments, end):
+        for i, (segment_start, words) in enumerate(segments):
+            segment_end = segments[i+1][0] if i + 1 < len(segments) else end
+            for j, word in enumerate(words):
+                yield segment_start + (segment_end - segment_start) * j / len(words), word
+
+    end = None
+    segments = []
+    for line in lines:
+        line = line.strip()
+        timing = SUBTITLE_TIMING_RE.search(line)
+        if timing or not line:
+            yield from cue_words(segments, end)
+            segments = []
+            if timing:
+                start, end = parse_timestamp(timing.group(1)), parse_timestamp(timing.group(2))
+                segments.append((start, []))
+            else:
+                end = None
+            continue
+        if end is None:
+            continue
+        parts = WORD_TIMESTAMP_RE.split(line)
+        # parts alternate text, timestamp, text, ...
+        for i, part in enumerate(parts):
+            if i % 2:
+                segments.append((parse_timestamp(part), []))
+            else:
+                segments[-1][1].extend(html.unescape(SUBTITLE_TAG_RE.sub("", part)).split())
+    yield from cue_words(segments, end)
+
+
+_word_timings = {}
+
+
+def load_word_timings(filepath):
+    """Read a JSON, CSV/TSV or WebVTT/SRT word timings file
+
+    Returns a pair of lists sorted by time: the start of each word (in
+    seconds) and the word, normalised for matching. These are cached until
+    the file changes, so splitting many strips reads it once
+    """
+    try:
+        key = (filepath, path.getmtime(filepath))
+    except OSError as err:
+        raise ValueError(f"Could not read word timings: {err}") from err
+    if key in _word_timings:
+        return _word_timings[key]
+
+    extension = path.splitext(filepath)[1].lower()
+    with open(filepath, encoding="utf-8-sig", errors="replace") as timings_file:
+        if extension == ".json":
+            # the json module can't stream, but it parses in C
+            timings = list(iter_json_word_timings(json.load(timings_file)))
+        elif extension in (".csv", ".tsv"):
+            timings = list(iter_csv_word_timings(timings_file,
+                                                 "\t" if extension == ".tsv" else ","))
+        elif extension in (".vtt", ".srt"):
+            timings = list(iter_vtt_word_timings(timings_file))
+        else:
+            raise ValueError(f"Word timings must be JSON, CSV, TSV or WebVTT, not {extension}")
+
+    timings.sort(key=lambda timing: timing[0])
+    result = ([start for start, _ in timings], [normalise_word(word) for _, word in timings])
+    _word_timings.clear()
+    _word_timings[key] = result
+    return result
+
+
+def match_word_timings(starts, timing_words, words, start, end, lookahead=4, slack=0.5):
+    """Work out when each of words, shown from start to end (in seconds), is said
+
+    starts and timing_words are from load_word_timings. The timings from
+    slack seconds before start up to end are found by bisection, then words
+    are matched to them in a single pass: each takes the first timing with
+    the same normalised word among the next lookahead, so punctuation, case,
+    and words missing from either side don't throw the rest out. Words
+    which aren't matched are spread evenly between their neighbours (or
+    start and end). Returns a NumPy array of start times, one per word
+    """
+    first = bisect.bisect_left(starts, start - slack)
+    last = bisect.bisect_left(starts, end)
+    matched_indexes, matched_times = [], []
+    next_timing = first
+    for i, word in enumerate(words):
+        word = normalise_word(word)
+        if not word:
+            continue
+        for j in range(next_timing, min(next_timing + lookahead, last)):
+            if timing_words[j] == word:
+                matched_indexes.append(i)
+                matched_times.append(max(starts[j], start))
+                next_timing = j + 1
+                break
+
+    if not matched_indexes or matched_indexes[0] != 0:
+        matched_indexes.insert(0, 0)
+        matched_times.insert(0, start)
+    matched_indexes.append(len(words))
+    matched_times.append(max(end, matched_times[-1]))
+    return np.interp(np.arange(len(words)), matched_indexes, matched_times)
+
+
+def get_word_timing_frames(sequence, ts_words, filepath):
+    """Get the frame each word of text strip sequence is said, from a word timings file"""
+    if not filepath:
+        raise ValueError("No word timings file chosen")
+    scene = sequence.id_data
+    fps = get_fps(scene)
+    starts, timing_words = load_word_timings(bpy.path.abspath(filepath))
+    seconds = match_word_timings(starts, timing_words, ts_words,
+                                 (sequence.frame_final_start - scene.frame_start) / fps,
+                                 (sequence.frame_final_end - scene.frame_start) / fps)
+    return scene.frame_start + np.round(seconds * fps).astype(np.int64)
+
+
+# END word timings
+
+
 REGISTER_CLASSES = [SetTextLocation, SetTextDuration,
                     SetTextSize, SetTextColour,
                     NewQTEColourPreset, NewQTELocationPreset,
                     NewQTESizePreset, NewQTEDurationPreset,
                     SAMPLE_OT_DirtyKeymap, QTERemoveKeyMapItem,
+                    QTE_OT_import_presets, QTE_OT_export_presets,
                     SEQUENCER_OT_split_to_appearing_words,
-                    SEQUENCER_PT_appearing_text]
+                    SEQUENCER_OT_split_to_appearing_words_modal,
+                    SEQUENCER_OT_relayout_appearing_words,
+                    SEQUENCER_OT_import_subtitles,
+                    SEQUENCER_OT_export_subtitles,
+                    SEQUENCER_OT_apply_preset_to_matching,
+                    SEQUENCER_OT_fit_text_to_frame,
+                    SEQUENCER_OT_check_text_collisions,
+                    QTE_OT_reset_profile, QTE_OT_dump_profile]
+# Only needed with a UI, so not registered in background mode
+UI_CLASSES = [SEQUENCER_PT_appearing_text,
+              SEQUENCER_PT_qte_profiling,
+              SEQUENCER_PT_qte_presets]
+# (bpy.types name, draw function) for menus and panels QTE adds to, also UI only
+UI_APPENDS = [("SEQUENCER_PT_effect", appearing_text_panel_layout),
+              ("TOPBAR_MT_file_import", import_subtitles_menu_entry),
+              ("TOPBAR_MT_file_export", export_subtitles_menu_entry)]
 DYNAMIC_CLASSES = []
 PREFERENCES_CLASSES = [LocationPresets,
                        SizePresets, DurationPresets,
@@ -769,26 +3392,311 @@ PREFERENCES_CLASSES = [LocationPresets,
                        QTEPreferences]
 
 
+# Whether UI_CLASSES and UI_APPENDS are registered
+_ui_registered = False
+
+
 def register():
+    global _ui_registered
     for classname in REGISTER_CLASSES:
         bpy.utils.register_class(classname)
     for classname in PREFERENCES_CLASSES:
         bpy.utils.register_class(classname)
-    bpy.types.SEQUENCER_PT_effect.append(appearing_text_panel_layout)
+    # blender -b (eg on a render farm) has no UI to draw, so skip it and
+    # keep startup fast
+    _ui_registered = not bpy.app.background
+    if _ui_registered:
+        for classname in UI_CLASSES:
+            bpy.utils.register_class(classname)
+        for type_name, draw in UI_APPENDS:
+            getattr(bpy.types, type_name).append(draw)
 
     bpy.types.WindowManager.appearing_text_options = \
         bpy.props.PointerProperty(type=AppearingWordsOptions)
 
+    addon = bpy.context.preferences.addons.get(__name__)
+    if addon is not None and addon.preferences is not None:
+        profiler.enabled = addon.preferences.enable_profiling
+
+    bpy.app.handlers.load_post.append(clear_font_metrics_handler)
+    atexit.register(save_glyph_stores)
+    bpy.app.handlers.depsgraph_update_post.append(text_strip_index_depsgraph_handler)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post,
+                     bpy.app.handlers.redo_post):
+        handlers.append(text_strip_index_reset_handler)
+
 
 def unregister():
+    global _ui_registered
     for classname in REGISTER_CLASSES:
         bpy.utils.unregister_class(classname)
     for classname in PREFERENCES_CLASSES:
         bpy.utils.unregister_class(classname)
-    bpy.types.SEQUENCER_PT_effect.remove(appearing_text_panel_layout)
+    if _ui_registered:
+        for classname in UI_CLASSES:
+            bpy.utils.unregister_class(classname)
+        for type_name, draw in UI_APPENDS:
+            getattr(bpy.types, type_name).remove(draw)
+        _ui_registered = False
 
     del bpy.types.WindowManager.appearing_text_options
 
+    bpy.app.handlers.load_post.remove(clear_font_metrics_handler)
+    atexit.unregister(save_glyph_stores)
+    clear_font_metrics()
+    bpy.app.handlers.depsgraph_update_post.remove(text_strip_index_depsgraph_handler)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post,
+                     bpy.app.handlers.redo_post):
+        handlers.remove(text_strip_index_reset_handler)
+    text_strip_index.invalidate()
+    _word_timings.clear()
+    profiler.enabled = False
+    profiler.reset()
+
+
+# BEGIN command line
+#
+#     blender -b file.blend --python quicker-text-editing.py -- --split --save
+#
+# runs QTE on file.blend without a UI or selection; see parse_cli_args for
+# everything it can do. Given --files, it instead runs a Blender for each
+# of several .blend files, a few at a time
+
+# Marks the line of a run's output with its summary (as JSON)
+CLI_SUMMARY_PREFIX = "QTE_SUMMARY "
+
+
+def parse_cli_args(argv):
+    """Parse the command line arguments after Blender's "--" """
+    # imported here, as they aren't needed to register QTE
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="blender -b file.blend --python quicker-text-editing.py --",
+        description="Split text strips, apply presets and import/export subtitles "
+        "in .blend files without a UI")
+    parser.add_argument("--scene", help="scene to work on (default: the file's active scene)")
+
+    group = parser.add_argument_group("which text strips to work on")
+    group.add_argument("--channels", type=int, nargs=2, metavar=("FIRST", "LAST"))
+    group.add_argument("--frames", type=int, nargs=2, metavar=("FIRST", "LAST"))
+    group.add_argument("--name", default="", help="wildcard pattern for strip names")
+    group.add_argument("--text", default="", help="regular expression searched for in strip text")
+
+    group = parser.add_argument_group("splitting to appearing words")
+    group.add_argument("--split", action="store_true", help="split the text strips")
+    group.add_argument("--offset-type", choices=[item[0] for item in aw_temporal_offset_options])
+    group.add_argument("--frame-offset", type=int)
+    group.add_argument("--word-timings", help="word timings file (implies --offset-type "
+                       "WordTimings)")
+    group.add_argument("--output-mode", choices=[item[0] for item in aw_output_mode_options])
+    group.add_argument("--line-break", choices=[item[0] for item in aw_line_break_options])
+    group.add_argument("--meta", action="store_true", help="group each sentence in a meta strip")
+
+    group = parser.add_argument_group("presets")
+    group.add_argument("--presets-file", help="presets exported from QTE's preferences "
+                       "(needed for --preset, as there's no user keymap in the background)")
+    group.add_argument("--preset", action="append", default=[], metavar="NAME",
+                       help="apply the preset called NAME to the text strips (repeatable)")
+
+    group = parser.add_argument_group("subtitles")
+    group.add_argument("--import-subtitles", metavar="PATH", help="SRT or WebVTT file to import")
+    group.add_argument("--subtitle-channel", type=int, default=1)
+    group.add_argument("--export-subtitles", metavar="PATH",
+                       help="write SRT, WebVTT or JSON (by extension)")
+
+    group = parser.add_argument_group("saving")
+    group.add_argument("--save", action="store_true", help="save the .blend file")
+    group.add_argument("--save-as", metavar="PATH", help="save the .blend file as PATH")
+
+    group = parser.add_argument_group("batch")
+    group.add_argument("--files", nargs="+", metavar="BLEND",
+                       help="run the above on each of these .blend files, in separate Blenders")
+    group.add_argument("--jobs", type=int, default=2, help="how many Blenders to run at once")
+    args = parser.parse_args(argv)
+    if args.preset and not args.presets_file:
+        parser.error("--preset needs --presets-file, as there's no user keymap to find "
+                     "presets in when running in the background")
+    return args
+
+
+def find_cli_presets(filepath, names):
+    """Get (operator class, properties) for each preset name, from a presets file
+
+    The user keymap can't be used, as Blender doesn't load it in the
+    background (and batch runs use --factory-startup)
+    """
+    available = {}
+    for preset in read_presets_file(filepath):
+        operator = PRESET_OPERATORS.get(preset.get("operator"))
+        properties = preset.get("properties", {})
+        if operator is not None and "name" in properties:
+            available.setdefault(properties["name"],
+                                 (operator, types.SimpleNamespace(**properties)))
+
+    missing = [name for name in names if name not in available]
+    if missing:
+        raise ValueError(f"No presets called {', '.join(missing)}")
+    return [available[name] for name in names]
+
+
+def run_cli(args):
+    """Do what args ask on the open .blend file; returns a summary dict"""
+    context = bpy.context
+    time_start = time.perf_counter()
+    scene = bpy.data.scenes[args.scene] if args.scene else context.scene
+    summary = {"file": bpy.data.filepath, "scene": scene.name, "errors": []}
+    filters = {"channel_range": args.channels, "frame_range": args.frames,
+               "name_pattern": args.name, "text_pattern": args.text}
+
+    if args.import_subtitles:
+        summary["subtitles_imported"] = import_subtitles(scene, args.import_subtitles,
+                                                         args.subtitle_channel)
+    if scene.sequence_editor is None:
+        scene.sequence_editor_create()
+    editor = scene.sequence_editor
+
+    if args.split:
+        options = context.window_manager.appearing_text_options
+        for attr, value in (("temporal_offset_type", args.offset_type),
+                            ("frame_offset", args.frame_offset),
+                            ("word_timings_path", args.word_timings),
+                            ("output_mode", args.output_mode),
+                            ("line_break", args.line_break)):
+            if value is not None:
+                setattr(options, attr, value)
+        if args.word_timings:
+            options.temporal_offset_type = "WordTimings"
+        options.use_meta = args.meta
+        if options.frame_offset < 0:
+            options.frame_offset = 1
+
+        # only top level strips, so --channels means the channels in the timeline
+        strips = [strip for strip in find_matching_text_strips(editor.sequences, **filters)
+                  if len(strip.text.split(" ")) > 1 and "qte_parent" not in strip]
+        allocator = ChannelAllocator.from_sequences(editor.sequences)
+        summary["split"] = summary["created"] = 0
+        for strip in strips:
+            try:
+                summary["created"] += len(split_text_strip(strip, options,
+                                                           scene.render.resolution_x, allocator))
+                summary["split"] += 1
+            except ValueError as err:
+                summary["errors"].append(f"Could not split {strip.name}: {err}")
+
+    if args.preset:
+        presets = find_cli_presets(args.presets_file, args.preset)
+        strips = find_matching_text_strips(editor.sequences_all, **filters)
+        for operator, preset in presets:
+            operator.apply_all(strips, preset)
+        summary["presets_applied"] = len(presets) * len(strips)
+
+    if args.export_subtitles:
+        extension = path.splitext(args.export_subtitles)[1].lower()
+        file_format = {".vtt": "VTT", ".json": "JSON"}.get(extension, "SRT")
+        summary["subtitles_exported"] = export_subtitles(scene, args.export_subtitles,
+                                                         file_format)
+
+    if args.save_as:
+        bpy.ops.wm.save_as_mainfile(filepath=args.save_as)
+        summary["saved"] = args.save_as
+    elif args.save:
+        bpy.ops.wm.save_mainfile()
+        summary["saved"] = bpy.data.filepath
+
+    summary["seconds"] = round(time.perf_counter() - time_start, 3)
+    return summary
+
+
+def remove_batch_args(argv):
+    """Get argv without --files (and its values) and --jobs, for running on one file"""
+    child_argv = []
+    skipping = False
+    argv = iter(argv)
+    for arg in argv:
+        if arg == "--jobs":
+            next(argv, None)
+            continue
+        if arg.startswith("--jobs="):
+            continue
+        if arg == "--files":
+            skipping = True
+            continue
+        if skipping and not arg.startswith("--"):
+            continue
+        skipping = False
+        child_argv.append(arg)
+    return child_argv
+
+
+def run_cli_batch(args, argv):
+    """Run a background Blender on each of args.files, args.jobs at a time
+
+    Prints a summary line per file and totals; returns True if every file
+    was processed without errors
+    """
+    # imported here, as they aren't needed to register QTE
+    import concurrent.futures
+    import subprocess
+
+    child_argv = remove_batch_args(argv)
+    script = path.abspath(__file__)
+
+    def run_one(blend_file):
+        command = [bpy.app.binary_path, "-b", "--factory-startup", blend_file,
+                   "--python", script, "--", *child_argv]
+        process = subprocess.run(command, capture_output=True, text=True)
+        for line in process.stdout.splitlines():
+            if line.startswith(CLI_SUMMARY_PREFIX):
+                summary = json.loads(line[len(CLI_SUMMARY_PREFIX):])
+                break
+        else:
+            # the last line of stderr is usually the most useful
+            stderr = process.stderr.strip().splitlines()
+            summary = {"errors": [stderr[-1] if stderr else
+                                  f"Blender exited with status {process.returncode}"]}
+        summary["file"] = blend_file
+        if process.returncode != 0 and not summary["errors"]:
+            summary["errors"].append(f"Blender exited with status {process.returncode}")
+        return summary
+
+    totals = collections.Counter()
+    ok = True
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        for summary in pool.map(run_one, args.files):
+            counts = {key: value for key, value in summary.items()
+                      if isinstance(value, int) and not isinstance(value, bool)}
+            totals.update(counts)
+            status = "FAILED" if summary["errors"] else "ok"
+            ok = ok and not summary["errors"]
+            details = ", ".join(f"{key} {value}" for key, value in counts.items())
+            print(f"{status:6} {summary['file']}: {details}")
+            for error in summary["errors"]:
+                print(f"       {error}")
+    print(f"{len(args.files)} files, " + ", ".join(f"{key} {value}"
+                                                  for key, value in totals.items()))
+    return ok
+
+
+def main(argv):
+    """Run QTE from the command line (the arguments after "--")"""
+    args = parse_cli_args(argv)
+    if args.files:
+        return 0 if run_cli_batch(args, argv) else 1
+    try:
+        summary = run_cli(args)
+    except (OSError, ValueError, KeyError, re.error, RuntimeError) as err:
+        # eg a bad --text pattern (re.error), or --save on an unsaved file (RuntimeError)
+        summary = {"file": bpy.data.filepath, "errors": [str(err)]}
+    print(CLI_SUMMARY_PREFIX + json.dumps(summary), flush=True)
+    return 1 if summary["errors"] else 0
+
+
+# END command line
+
 
 if __name__ == "__main__":
     register()
+    # run from the command line with arguments, rather than (eg) Blender's text editor
+    if "--" in sys.argv:
+        sys.exit(main(sys.argv[sys.argv.index("--") + 1:]))
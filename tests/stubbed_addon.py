@@ -0,0 +1,39 @@
+"""Load QTE outside Blender, for tests
+
+Run the tests with python -m unittest discover -s tests (or pytest) from
+the repository root. The addon imports bpy, blf and bpy_extras, which
+only exist inside Blender, so those are stubbed just enough for the
+module to load; the code under test only needs NumPy
+"""
+import importlib.util
+import sys
+import types
+from os import path
+from unittest import mock
+
+ADDON_PATH = path.join(path.dirname(path.dirname(path.abspath(__file__))),
+                       "quicker-text-editing.py")
+
+
+def load_addon():
+    """Import quicker-text-editing.py (its name isn't a valid module name) with stub Blender modules"""
+    bpy = mock.MagicMock()
+    # classes in the addon subclass these, so they need to be real classes
+    for name in ("Operator", "PropertyGroup", "AddonPreferences", "Panel"):
+        setattr(bpy.types, name, type(name, (), {}))
+    bpy.app.handlers.persistent = lambda function: function
+    io_utils = types.ModuleType("bpy_extras.io_utils")
+    io_utils.ImportHelper = type("ImportHelper", (), {})
+    io_utils.ExportHelper = type("ExportHelper", (), {})
+    stubs = {"bpy": bpy, "bpy.app": bpy.app, "bpy.app.handlers": bpy.app.handlers,
+             "blf": mock.MagicMock(), "bpy_extras": mock.MagicMock(),
+             "bpy_extras.io_utils": io_utils}
+
+    with mock.patch.dict(sys.modules, stubs):
+        spec = importlib.util.spec_from_file_location("quicker_text_editing", ADDON_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+qte = load_addon()
@@ -0,0 +1,182 @@
+"""Check find_collisions, break_lines and match_word_timings against brute force"""
+import collections
+import itertools
+import random
+import unittest
+
+import numpy as np
+
+from stubbed_addon import qte
+
+
+def brute_force_collisions(boxes):
+    """Every pair of boxes overlapping in time and on screen, comparing each pair"""
+    pairs = []
+    for i, j in itertools.combinations(range(len(boxes)), 2):
+        start, end, x0, y0, x1, y1 = boxes[i]
+        other_start, other_end, other_x0, other_y0, other_x1, other_y1 = boxes[j]
+        if (start < other_end and other_start < end and x0 < other_x1 and other_x0 < x1
+                and y0 < other_y1 and other_y0 < y1):
+            pairs.append((i, j))
+    return pairs
+
+
+def line_widths(widths, space_width, lines):
+    """Width of each line, given the line number of each word"""
+    totals = {}
+    for width, line in zip(widths, lines):
+        totals[line] = totals[line] + space_width + width if line in totals else width
+    return [totals[line] for line in sorted(totals)]
+
+
+def break_cost(widths, space_width, max_width, lines):
+    """The sum of the squared space left on every line but the last, or None
+    if a line with more than one word is too wide"""
+    cost = 0.0
+    word_counts = collections.Counter(lines)
+    totals = line_widths(widths, space_width, lines)
+    for line, line_width in enumerate(totals):
+        if line_width > max_width and word_counts[line] > 1:
+            return None
+        if line < len(totals) - 1:
+            cost += max(max_width - line_width, 0.0) ** 2
+    return cost
+
+
+def brute_force_break_cost(widths, space_width, max_width):
+    """The least break_cost of every way of breaking the words into lines"""
+    best = None
+    for breaks in itertools.product((0, 1), repeat=len(widths) - 1):
+        lines = list(itertools.accumulate((0, *breaks)))
+        cost = break_cost(widths, space_width, max_width, lines)
+        if cost is not None and (best is None or cost < best):
+            best = cost
+    return best
+
+
+def naive_match_word_timings(starts, timing_words, words, start, end, lookahead=4,
+                             slack=0.5):
+    """match_word_timings with a linear scan for the timings and a loop to interpolate"""
+    window = [j for j, timing_start in enumerate(starts) if start - slack <= timing_start < end]
+    first, last = (window[0], window[-1] + 1) if window else (0, 0)
+    matched = {}
+    next_timing = first
+    for i, word in enumerate(words):
+        word = qte.normalise_word(word)
+        if not word:
+            continue
+        for j in range(next_timing, min(next_timing + lookahead, last)):
+            if timing_words[j] == word:
+                matched[i] = max(starts[j], start)
+                next_timing = j + 1
+                break
+
+    matched.setdefault(0, start)
+    matched[len(words)] = max(end, matched[max(matched)])
+    known = sorted(matched)
+    times = []
+    for i in range(len(words)):
+        before = max(index for index in known if index <= i)
+        after = min(index for index in known if index >= i)
+        if before == after:
+            times.append(matched[i])
+        else:
+            fraction = (i - before) / (after - before)
+            times.append(matched[before] + fraction * (matched[after] - matched[before]))
+    return times
+
+
+class FindCollisionsTest(unittest.TestCase):
+
+    def test_random_boxes(self):
+        rng = random.Random(20)
+        for count in (0, 1, 2, 10, 100, 400):
+            boxes = []
+            for _ in range(count):
+                # small whole numbers, so boxes often touch without overlapping
+                start = rng.randrange(0, 50)
+                x0, y0 = rng.randrange(0, 20), rng.randrange(0, 20)
+                boxes.append((start, start + rng.randrange(1, 15), x0, y0,
+                              x0 + rng.randrange(1, 8), y0 + rng.randrange(1, 8)))
+            with self.subTest(count=count):
+                self.assertEqual(sorted(qte.find_collisions(boxes)),
+                                 brute_force_collisions(boxes))
+
+    def test_many_subtitles(self):
+        # each subtitle overlaps the next by a few frames, in the same place
+        count = 50000
+        boxes = [(10 * i, 10 * i + 13, 100, 50, 900, 120) for i in range(count)]
+        self.assertEqual(sorted(qte.find_collisions(boxes)),
+                         [(i, i + 1) for i in range(count - 1)])
+
+    def test_touching_boxes_dont_collide(self):
+        boxes = [(0, 10, 0, 0, 10, 10), (10, 20, 0, 0, 10, 10), (0, 10, 10, 0, 20, 10),
+                 (0, 10, 0, 10, 10, 20)]
+        self.assertEqual(qte.find_collisions(boxes), [])
+
+
+class BreakLinesTest(unittest.TestCase):
+
+    def random_widths(self, rng, count):
+        return [float(rng.randrange(5, 60)) for _ in range(count)]
+
+    def test_optimal_is_least_cost(self):
+        rng = random.Random(18)
+        for count in range(1, 11):
+            for max_width in (40.0, 90.0, 150.0):
+                widths = self.random_widths(rng, count)
+                with self.subTest(widths=widths, max_width=max_width):
+                    lines = qte.break_lines(widths, 6.0, max_width, "OPTIMAL")
+                    self.assertEqual(lines[0], 0)
+                    self.assertTrue(np.all(np.diff(lines) >= 0))
+                    self.assertAlmostEqual(break_cost(widths, 6.0, max_width, list(lines)),
+                                           brute_force_break_cost(widths, 6.0, max_width))
+
+    def test_greedy_fills_each_line(self):
+        rng = random.Random(18)
+        for count in range(1, 30):
+            widths = self.random_widths(rng, count)
+            lines = list(qte.break_lines(widths, 6.0, 100.0, "GREEDY"))
+            with self.subTest(widths=widths):
+                self.assertIsNotNone(break_cost(widths, 6.0, 100.0, lines))
+                totals = line_widths(widths, 6.0, lines)
+                for line, line_width in enumerate(totals[:-1]):
+                    # the first word of the next line wouldn't have fitted
+                    next_word = widths[lines.index(line + 1)]
+                    self.assertGreater(line_width + 6.0 + next_word, 100.0)
+
+    def test_wide_word_gets_its_own_line(self):
+        for mode in ("GREEDY", "OPTIMAL"):
+            with self.subTest(mode=mode):
+                self.assertEqual(qte.break_lines([10, 500, 10], 5, 100, mode).tolist(),
+                                 [0, 1, 2])
+
+
+class MatchWordTimingsTest(unittest.TestCase):
+
+    def test_against_naive(self):
+        rng = random.Random(19)
+        vocabulary = ["the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog"]
+        for _ in range(200):
+            timing_words = [rng.choice(vocabulary) for _ in range(rng.randrange(0, 40))]
+            starts = sorted(rng.uniform(0, 20) for _ in timing_words)
+            words = [rng.choice(vocabulary + ["Fox,", "DOG!", "--"])
+                     for _ in range(rng.randrange(1, 12))]
+            start = rng.uniform(0, 15)
+            end = start + rng.uniform(0.5, 5)
+            with self.subTest(words=words, start=start, end=end):
+                np.testing.assert_allclose(
+                    qte.match_word_timings(starts, timing_words, words, start, end),
+                    naive_match_word_timings(starts, timing_words, words, start, end))
+
+    def test_missing_and_punctuated_words(self):
+        starts = [1.0, 1.5, 2.0, 3.0]
+        timing_words = ["the", "quick", "fox", "jumps"]
+        times = qte.match_word_timings(starts, timing_words,
+                                       ["The", "quick", "brown", "fox,", "jumps"], 1.0, 4.0)
+        # "brown" isn't in the timings, so goes halfway between its neighbours
+        np.testing.assert_allclose(times, [1.0, 1.5, 1.75, 2.0, 3.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Check layout_appearing_words against the per-word loop it replaced"""
+import unittest
+
+import numpy as np
+
+from stubbed_addon import qte
+
+
+def baseline_layout(words, widths, space_width, parent_duration, offset_type, frame_offset,
+                    extra_word_spacing, frame_start, location_x, rez_x):
+    """The per-word loop from split_text_strip before layout_appearing_words, minus bpy"""
+    average_word_length = sum(map(len, words)) / len(words)
+    frame_end = frame_start + parent_duration
+    frame_starts = []
+    location_xs = []
+    for i, word in enumerate(words):
+        start = int(frame_start)
+        if i > 0:
+            previous = words[i-1]
+            if offset_type == "Fixed":
+                offset = frame_offset
+            if offset_type == "RelativeLength":
+                offset = frame_offset * (len(previous) / average_word_length)
+            elif offset_type == "ParentEqual":
+                offset = int(parent_duration / len(words))
+            elif offset_type == "ParentRelativeLength":
+                offset = int(parent_duration / len(words)) * \
+                    (len(previous) / average_word_length)
+            start = int(frame_starts[-1] + offset)
+        frame_starts.append(min(start, frame_end - 1))
+
+        if i == 0:
+            location_xs.append(location_x)
+        else:
+            location_xs.append(location_xs[-1] + (widths[i-1] / rez_x) + (space_width / rez_x)
+                               + (extra_word_spacing * space_width / rez_x))
+    return frame_starts, location_xs
+
+
+class LayoutAppearingWordsTest(unittest.TestCase):
+
+    WORDS = "the narrativism of farce keeps every subtitle editor busy".split(" ")
+    OFFSET_TYPES = ("Fixed", "RelativeLength", "ParentEqual", "ParentRelativeLength")
+
+    def check(self, words, parent_duration, frame_offset=3, extra_word_spacing=0.5,
+              frame_start=10, location_x=0.1, rez_x=1920):
+        widths = [len(word) * 11.5 for word in words]
+        space_width = 6.25
+        for offset_type in self.OFFSET_TYPES:
+            with self.subTest(offset_type=offset_type, words=len(words),
+                              parent_duration=parent_duration):
+                frame_starts, location_xs = qte.layout_appearing_words(
+                    [len(word) for word in words], widths, space_width, parent_duration,
+                    offset_type=offset_type, frame_offset=frame_offset,
+                    extra_word_spacing=extra_word_spacing, frame_start=frame_start,
+                    location_x=location_x, rez_x=rez_x)
+                expected_starts, expected_xs = baseline_layout(
+                    words, widths, space_width, parent_duration, offset_type, frame_offset,
+                    extra_word_spacing, frame_start, location_x, rez_x)
+                self.assertEqual(frame_starts.tolist(), expected_starts)
+                np.testing.assert_allclose(location_xs, expected_xs)
+
+    def test_sentence(self):
+        self.check(self.WORDS, parent_duration=120)
+
+    def test_clamped_to_parent_end(self):
+        # the later words would start after the parent strip ends
+        self.check(self.WORDS, parent_duration=12, frame_offset=5)
+
+    def test_two_words(self):
+        self.check(["a", "sentence"], parent_duration=7, frame_offset=2)
+
+    def test_equal_length_words(self):
+        self.check(["aaa"] * 6, parent_duration=50, extra_word_spacing=0.0)
+
+    def test_unknown_offset_type(self):
+        with self.assertRaises(ValueError):
+            qte.layout_appearing_words([1, 2], [5, 10], 3, 10, offset_type="Sideways")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Check animate_strips with stand-ins for strips, scenes and F-curves"""
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from stubbed_addon import qte
+
+
+class KeyframePoints:
+    """Just enough of bpy's FCurveKeyframePoints: a list of [frame, value]"""
+
+    def __init__(self, keys=()):
+        self.keys = [list(key) for key in keys]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, i):
+        return self.keys[i]
+
+    def foreach_get(self, attr, array):
+        array[:] = np.ravel(self.keys) if self.keys else []
+
+    def foreach_set(self, attr, array):
+        self.keys = [list(key) for key in np.reshape(array, (-1, 2))]
+
+    def remove(self, point, fast=False):
+        # like bpy, the point has to be one of the curve's
+        for i, key in enumerate(self.keys):
+            if key is point:
+                del self.keys[i]
+                return
+        raise RuntimeError("keyframe not found")
+
+    def add(self, count):
+        self.keys.extend([0.0, 0.0] for _ in range(count))
+
+
+class FCurve:
+    def __init__(self, data_path, array_index, keys=()):
+        self.data_path = data_path
+        self.array_index = array_index
+        self.keyframe_points = KeyframePoints(keys)
+
+    def update(self):
+        self.keyframe_points.keys.sort()
+
+
+class FCurves(list):
+    def new(self, data_path, index=0, action_group=""):
+        fcurve = FCurve(data_path, index)
+        self.append(fcurve)
+        return fcurve
+
+
+class Scene:
+    def __init__(self, action, frame_current=0):
+        self.name = "Scene"
+        self.frame_current = frame_current
+        self.animation_data = SimpleNamespace(action=action)
+
+
+class Strip:
+    def __init__(self, scene, name, start, end, color):
+        self.id_data = scene
+        self.name = name
+        self.frame_final_start = start
+        self.frame_final_end = end
+        self.color = color
+
+    def path_from_id(self, attr):
+        return f'sequence_editor.sequences_all["{self.name}"].{attr}'
+
+
+class AnimateStripsTest(unittest.TestCase):
+
+    def test_several_strips_with_existing_keyframes(self):
+        action = SimpleNamespace(fcurves=FCurves())
+        scene = Scene(action)
+        strips = [Strip(scene, f"text{i}", 10 * i, 10 * i + 8, (0.0, 0.0, 0.0, 1.0))
+                  for i in range(3)]
+        for strip in strips:
+            data_path = strip.path_from_id("color")
+            for index in range(4):
+                # one key before the transition, one inside it and one after
+                action.fcurves.append(FCurve(data_path, index, [
+                    (strip.frame_final_start - 5, 0.5), (strip.frame_final_start + 2, 0.25),
+                    (strip.frame_final_start + 20, 0.75)]))
+
+        qte.animate_strips(strips, "color", (1.0, 0.0, 0.0, 1.0), 4)
+
+        for strip in strips:
+            start = strip.frame_final_start
+            for fcurve in action.fcurves:
+                if fcurve.data_path != strip.path_from_id("color"):
+                    continue
+                old = strip.color[fcurve.array_index]
+                new = (1.0, 0.0, 0.0, 1.0)[fcurve.array_index]
+                with self.subTest(strip=strip.name, index=fcurve.array_index):
+                    self.assertEqual(fcurve.keyframe_points.keys,
+                                     [[start - 5, 0.5], [start, old], [start + 4, new],
+                                      [start + 20, 0.75]])
+
+
+if __name__ == "__main__":
+    unittest.main()